@@ -1,17 +1,41 @@
+import asyncio
+import atexit
 import json
 import sys
 import time
 
 import httpx
 import typer
+import websockets
+from websockets.exceptions import WebSocketException
 
 app = typer.Typer(name="local-agent", help="CLI for the Local Agent browser automation tool.")
 
 BASE_URL = "http://localhost:8000"
+WS_URL = BASE_URL.replace("http", "ws", 1) + "/api/ws"
 
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+POLL_MIN_INTERVAL = 0.2
+POLL_MAX_INTERVAL = 2.0
+# Seconds without any WebSocket frame before falling back to polling
+WS_RECV_TIMEOUT = 30.0
+SPINNER = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
 
-def _client() -> httpx.Client:
-    return httpx.Client(base_url=BASE_URL, timeout=30)
+_http: httpx.Client | None = None
+
+
+def _get_client() -> httpx.Client:
+    """Return the shared keep-alive client, creating it on first use."""
+    global _http
+    if _http is None:
+        _http = httpx.Client(
+            base_url=BASE_URL,
+            timeout=30,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+        )
+        atexit.register(_http.close)
+    return _http
 
 
 @app.command()
@@ -22,102 +46,170 @@ def task(
     follow: bool = typer.Option(True, "--follow/--no-follow", help="Follow progress"),
 ):
     """Submit a task for the agent to execute."""
-    with _client() as client:
-        body = {"instruction": instruction}
-        if url:
-            body["url"] = url
-        if max_steps:
-            body["max_steps"] = max_steps
-
-        resp = client.post("/api/task", json=body)
-        if resp.status_code == 409:
-            typer.echo("Error: A task is already running.", err=True)
-            raise typer.Exit(1)
-        resp.raise_for_status()
-
-        data = resp.json()
-        task_id = data["task_id"]
-        typer.echo(f"Task {task_id} created: {data['instruction']}")
-
-        if follow:
+    client = _get_client()
+    body = {"instruction": instruction}
+    if url:
+        body["url"] = url
+    if max_steps:
+        body["max_steps"] = max_steps
+
+    resp = client.post("/api/task", json=body)
+    if resp.status_code == 409:
+        typer.echo("Error: A task is already running.", err=True)
+        raise typer.Exit(1)
+    resp.raise_for_status()
+
+    data = resp.json()
+    task_id = data["task_id"]
+    typer.echo(f"Task {task_id} created: {data['instruction']}")
+
+    if follow:
+        try:
+            asyncio.run(_follow_task_ws(client, task_id))
+        except (OSError, TimeoutError, WebSocketException):
+            # No WebSocket upgrade (or it dropped or went quiet) — fall back to polling
             _follow_task(client, task_id)
 
 
 @app.command()
 def status(task_id: str = typer.Argument(..., help="Task ID to check")):
     """Check the status of a task."""
-    with _client() as client:
-        resp = client.get(f"/api/task/{task_id}")
-        resp.raise_for_status()
-        data = resp.json()
-        _print_status(data)
+    client = _get_client()
+    resp = client.get(f"/api/task/{task_id}")
+    resp.raise_for_status()
+    data = resp.json()
+    _print_status(data)
 
 
 @app.command()
 def cancel(task_id: str = typer.Argument(..., help="Task ID to cancel")):
     """Cancel a running task."""
-    with _client() as client:
-        resp = client.post(f"/api/task/{task_id}/cancel")
-        resp.raise_for_status()
-        typer.echo(f"Task {task_id} cancelled.")
+    client = _get_client()
+    resp = client.post(f"/api/task/{task_id}/cancel")
+    resp.raise_for_status()
+    typer.echo(f"Task {task_id} cancelled.")
 
 
 @app.command()
 def screenshot(output: str = typer.Option("screenshot.png", "--output", "-o", help="Output file")):
     """Save a screenshot of the current browser state."""
-    with _client() as client:
-        resp = client.get("/api/screenshot")
+    client = _get_client()
+    with client.stream("GET", "/api/screenshot") as resp:
         resp.raise_for_status()
         with open(output, "wb") as f:
-            f.write(resp.content)
-        typer.echo(f"Screenshot saved to {output}")
+            for chunk in resp.iter_bytes(65536):
+                f.write(chunk)
+    typer.echo(f"Screenshot saved to {output}")
 
 
 @app.command()
 def navigate(url: str = typer.Argument(..., help="URL to navigate to")):
     """Navigate the browser to a URL."""
-    with _client() as client:
-        resp = client.post("/api/navigate", json={"url": url})
-        resp.raise_for_status()
-        typer.echo(f"Navigated to {url}")
+    client = _get_client()
+    resp = client.post("/api/navigate", json={"url": url})
+    resp.raise_for_status()
+    typer.echo(f"Navigated to {url}")
+
+
+@app.command(name="batch-status")
+def batch_status(batch_id: str = typer.Argument(..., help="Batch ID to check")):
+    """Check the status of a batch run (all rows in one request)."""
+    client = _get_client()
+    resp = client.get(f"/api/batch/{batch_id}")
+    resp.raise_for_status()
+    data = resp.json()
+    typer.echo(f"Batch:  {data['batch_id']} ({data['workflow_name']})")
+    typer.echo(f"Status: {data['status']}")
+    typer.echo(f"Rows:   {data['completed']} completed, {data['failed']} failed, {data['total']} total")
+    for row in data["rows"]:
+        line = f"  [{row['index'] + 1}] {row['status']}"
+        if row.get("error"):
+            line += f" — {row['error']}"
+        typer.echo(line)
 
 
 @app.command(name="save-session")
 def save_session():
     """Save the current browser session (cookies/localStorage)."""
-    with _client() as client:
-        resp = client.post("/api/session/save")
+    client = _get_client()
+    resp = client.post("/api/session/save")
+    resp.raise_for_status()
+    typer.echo(f"Session saved: {resp.json()['path']}")
+
+
+async def _follow_task_ws(client: httpx.Client, task_id: str) -> None:
+    """Follow task progress via the server's WebSocket status broadcasts."""
+    async with websockets.connect(WS_URL) as ws:
+        # Broadcasts sent before we subscribed are lost — seed from the REST status
+        resp = client.get(f"/api/task/{task_id}")
         resp.raise_for_status()
-        typer.echo(f"Session saved: {resp.json()['path']}")
+        data = resp.json()
+
+        spinner = asyncio.create_task(_spin(data))
+        try:
+            while data["status"] not in TERMINAL_STATUSES:
+                event = json.loads(await asyncio.wait_for(ws.recv(), WS_RECV_TIMEOUT))
+                if event.get("type") == "task_status" and event.get("task_id") == task_id:
+                    data.update(event)
+        finally:
+            spinner.cancel()
+
+    _render_progress(data, 0)
+    sys.stdout.write("\n")
+    _print_status(data)
+
+
+async def _spin(data: dict) -> None:
+    """Redraw the progress line from the latest status until cancelled."""
+    idx = 0
+    while True:
+        _render_progress(data, idx)
+        idx += 1
+        await asyncio.sleep(0.1)
 
 
 def _follow_task(client: httpx.Client, task_id: str) -> None:
-    """Poll task status until completion."""
-    spinner = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
+    """Poll task status until completion.
+
+    Polls quickly right after a change and backs off geometrically while the
+    task sits idle (e.g. waiting on a long LLM call).
+    """
     idx = 0
+    interval = POLL_MIN_INTERVAL
+    last_state = None
 
     while True:
         resp = client.get(f"/api/task/{task_id}")
         resp.raise_for_status()
         data = resp.json()
 
-        s = data["status"]
-        action = data.get("current_action", "")
-        steps = data.get("steps_completed", 0)
-
-        sys.stdout.write(f"\r{spinner[idx % len(spinner)]} [{s}] Step {steps}")
-        if action:
-            sys.stdout.write(f" — {action}")
-        sys.stdout.write("    ")
-        sys.stdout.flush()
+        _render_progress(data, idx)
         idx += 1
 
-        if s in ("completed", "failed", "cancelled"):
+        if data["status"] in TERMINAL_STATUSES:
             sys.stdout.write("\n")
             _print_status(data)
             break
 
-        time.sleep(1)
+        state = (data["status"], data.get("steps_completed"), data.get("current_action"))
+        if state == last_state:
+            interval = min(interval * 1.5, POLL_MAX_INTERVAL)
+        else:
+            interval = POLL_MIN_INTERVAL
+            last_state = state
+
+        time.sleep(interval)
+
+
+def _render_progress(data: dict, idx: int) -> None:
+    action = data.get("current_action") or ""
+    steps = data.get("steps_completed", 0)
+
+    sys.stdout.write(f"\r{SPINNER[idx % len(SPINNER)]} [{data['status']}] Step {steps}")
+    if action:
+        sys.stdout.write(f" — {action}")
+    sys.stdout.write("    ")
+    sys.stdout.flush()
 
 
 def _print_status(data: dict) -> None:
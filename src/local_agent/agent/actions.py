@@ -1,4 +1,6 @@
 import asyncio
+import logging
+import re
 
 from playwright.async_api import Page
 
@@ -7,6 +9,10 @@ from local_agent.llm.base import AgentAction
 from local_agent.utils.errors import BrowserError
 from local_agent.utils.logging import logger
 
+# Actions that send no input to the page. The screenshot cache falls back to
+# the page's mutation counter to decide whether these changed anything.
+_PASSIVE_ACTIONS = frozenset({"screenshot", "wait"})
+
 
 class ActionExecutor:
     """Translates AgentAction objects into Playwright calls."""
@@ -18,13 +24,16 @@ class ActionExecutor:
     async def execute(self, action: AgentAction) -> str | None:
         """Execute a single action. Returns an error string or None on success."""
         name = action.action
-        logger.info("Executing: %s %s", name, _summarize(action))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing: %s %s", name, _summarize(action))
 
         try:
-            handler = getattr(self, f"_do_{name}", None)
+            handler = self._HANDLERS.get(name)
             if handler is None:
                 return f"Unknown action: {name}"
-            await handler(action)
+            if name not in _PASSIVE_ACTIONS:
+                self._screenshot.mark_dirty()
+            await handler(self, action)
             return None
         except Exception as exc:
             logger.warning("Action %s failed: %s", name, exc)
@@ -86,15 +95,8 @@ class ActionExecutor:
         direction = action.scroll_direction or "down"
         amount = (action.scroll_amount or 3) * 100  # pixels per scroll unit
 
-        dx, dy = 0, 0
-        if direction == "down":
-            dy = amount
-        elif direction == "up":
-            dy = -amount
-        elif direction == "right":
-            dx = amount
-        elif direction == "left":
-            dx = -amount
+        ux, uy = _SCROLL_VEC.get(direction, (0, 0))
+        dx, dy = ux * amount, uy * amount
 
         await self._page.mouse.move(x, y)
         await self._page.mouse.wheel(dx, dy)
@@ -111,6 +113,22 @@ class ActionExecutor:
             await asyncio.sleep(min(duration, 5))
             await self._page.keyboard.up(key)
 
+    _HANDLERS = {
+        "screenshot": _do_screenshot,
+        "left_click": _do_left_click,
+        "right_click": _do_right_click,
+        "middle_click": _do_middle_click,
+        "double_click": _do_double_click,
+        "triple_click": _do_triple_click,
+        "mouse_move": _do_mouse_move,
+        "left_click_drag": _do_left_click_drag,
+        "type": _do_type,
+        "key": _do_key,
+        "scroll": _do_scroll,
+        "wait": _do_wait,
+        "hold_key": _do_hold_key,
+    }
+
     # -- Helpers ---------------------------------------------------------------
 
     def _screen_coords(self, action: AgentAction) -> tuple[int, int]:
@@ -119,30 +137,41 @@ class ActionExecutor:
         return self._screenshot.scale_coordinates_to_screen(*action.coordinate)
 
 
+# Unit wheel vector per scroll direction
+_SCROLL_VEC = {
+    "down": (0, 1),
+    "up": (0, -1),
+    "right": (1, 0),
+    "left": (-1, 0),
+}
+
+# Anthropic key names (lowercased) -> Playwright key names
+_KEY_MAP = {
+    "ctrl": "Control",
+    "cmd": "Meta",
+    "super": "Meta",
+    "alt": "Alt",
+    "shift": "Shift",
+    "enter": "Enter",
+    "return": "Enter",
+    "tab": "Tab",
+    "escape": "Escape",
+    "esc": "Escape",
+    "backspace": "Backspace",
+    "delete": "Delete",
+    "space": " ",
+    "arrowup": "ArrowUp",
+    "arrowdown": "ArrowDown",
+    "arrowleft": "ArrowLeft",
+    "arrowright": "ArrowRight",
+}
+
+_KEY_SPLIT = re.compile(r"\s*\+\s*")
+
+
 def _normalize_key_combo(combo: str) -> str:
     """Convert Anthropic key names to Playwright key names."""
-    replacements = {
-        "ctrl": "Control",
-        "cmd": "Meta",
-        "super": "Meta",
-        "alt": "Alt",
-        "shift": "Shift",
-        "enter": "Enter",
-        "return": "Enter",
-        "tab": "Tab",
-        "escape": "Escape",
-        "esc": "Escape",
-        "backspace": "Backspace",
-        "delete": "Delete",
-        "space": " ",
-        "arrowup": "ArrowUp",
-        "arrowdown": "ArrowDown",
-        "arrowleft": "ArrowLeft",
-        "arrowright": "ArrowRight",
-    }
-    parts = combo.split("+")
-    normalized = [replacements.get(p.strip().lower(), p.strip()) for p in parts]
-    return "+".join(normalized)
+    return "+".join(_KEY_MAP.get(p.lower(), p) for p in _KEY_SPLIT.split(combo.strip()))
 
 
 def _summarize(action: AgentAction) -> str:
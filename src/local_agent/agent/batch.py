@@ -1,43 +1,63 @@
 """Batch workflow execution — run one workflow with multiple parameter sets.
 
-Orchestrates sequential execution: loads workflow once, loops through rows,
-resolves parameters per row, runs direct/AI replay, broadcasts progress.
+Orchestrates execution: loads workflow once, loops through rows (optionally
+several at once in direct mode), resolves parameters per row, runs
+direct/AI replay, broadcasts progress.
 """
 
 from __future__ import annotations
 
 import asyncio
-import uuid
 from dataclasses import dataclass, field
 
 from local_agent.agent.loop import TaskState, run_agent_loop
-from local_agent.agent.replay import run_workflow_direct
+from local_agent.agent.replay import run_workflow_direct, warm_locator_specs
 from local_agent.agent.workflow import Workflow
 from local_agent.api.models import TaskStatus
 from local_agent.api.websocket import broadcast
 from local_agent.browser.manager import BrowserManager
 from local_agent.browser.screenshot import ScreenshotCapture
+from local_agent.utils.ids import new_id
 from local_agent.utils.logging import logger
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchRowResult:
     index: int
     parameters: dict[str, str]
     status: str = "pending"  # pending / running / completed / failed / skipped
     task_id: str = ""
     error: str = ""
-
-
-@dataclass
+    _dict_cache: dict | None = field(default=None, init=False, repr=False, compare=False)
+    _dict_key: tuple = field(default=(), init=False, repr=False, compare=False)
+
+    def to_dict(self) -> dict:
+        """Plain dict for API responses, rebuilt only after the row changes."""
+        key = (self.status, self.task_id, self.error)
+        if self._dict_cache is None or key != self._dict_key:
+            self._dict_cache = {
+                "index": self.index,
+                "parameters": self.parameters,
+                "status": self.status,
+                "task_id": self.task_id,
+                "error": self.error,
+            }
+            self._dict_key = key
+        return self._dict_cache
+
+
+@dataclass(slots=True)
 class BatchState:
     batch_id: str
     workflow_name: str
     mode: str  # "direct" or "ai"
     rows: list[dict[str, str]]
+    concurrency: int = 1  # rows run in parallel (direct mode only)
     current_index: int = 0
     results: list[BatchRowResult] = field(default_factory=list)
     status: str = "pending"  # pending / running / completed / failed / cancelled
+    completed_count: int = 0  # maintained by run_batch as rows finish
+    failed_count: int = 0
     _cancel: bool = False
 
     def cancel(self) -> None:
@@ -47,14 +67,6 @@ class BatchState:
     def is_cancelled(self) -> bool:
         return self._cancel
 
-    @property
-    def completed_count(self) -> int:
-        return sum(1 for r in self.results if r.status == "completed")
-
-    @property
-    def failed_count(self) -> int:
-        return sum(1 for r in self.results if r.status == "failed")
-
 
 async def run_batch(
     batch: BatchState,
@@ -63,65 +75,50 @@ async def run_batch(
     screenshot: ScreenshotCapture,
     tasks: dict[str, TaskState],
 ) -> None:
-    """Run a workflow for each row of parameters sequentially."""
+    """Run a workflow for each row of parameters.
+
+    Rows run one after another on the main page. Direct-mode batches with
+    concurrency > 1 run up to that many rows at once, each on its own page
+    in the shared browser context. AI mode always stays sequential.
+    """
     batch.status = "running"
     await _broadcast_batch(batch)
 
-    for i, row in enumerate(batch.rows):
+    if batch.mode == "direct":
+        # Element fields are never templated, so every row shares these
+        warm_locator_specs(workflow)
+
+    if batch.mode == "direct" and batch.concurrency > 1:
+        pending = iter(range(len(batch.rows)))
+
+        async def worker() -> None:
+            # Each worker has its own capture: the cached image and CDP
+            # session belong to one page, and rows run on separate pages
+            capture = ScreenshotCapture()
+            for i in pending:
+                if batch.is_cancelled:
+                    batch.results[i].status = "skipped"
+                    continue
+                await _run_row(batch, i, workflow, browser, capture, tasks, own_page=True)
+
+        workers = min(batch.concurrency, len(batch.rows))
+        await asyncio.gather(*(worker() for _ in range(workers)))
         if batch.is_cancelled:
-            # Mark remaining rows as skipped
-            for r in batch.results[i:]:
-                r.status = "skipped"
             batch.status = "cancelled"
             await _broadcast_batch(batch)
-            logger.info("Batch %s cancelled at row %d", batch.batch_id, i)
+            logger.info("Batch %s cancelled", batch.batch_id)
             return
-
-        batch.current_index = i
-        row_result = batch.results[i]
-        row_result.status = "running"
-        await _broadcast_batch(batch)
-
-        try:
-            # Resolve parameters for this row
-            resolved = workflow.resolve(row)
-
-            # Create a task for this row
-            task_id = uuid.uuid4().hex[:12]
-            instruction = (
-                resolved.to_instruction()
-                if batch.mode == "ai"
-                else f"Batch {batch.workflow_name} [{i + 1}/{len(batch.rows)}]"
-            )
-            task = TaskState(task_id=task_id, instruction=instruction)
-            tasks[task_id] = task
-            row_result.task_id = task_id
-
-            # Navigate to start URL
-            if resolved.start_url:
-                await browser.page.goto(
-                    resolved.start_url, wait_until="domcontentloaded"
-                )
-
-            # Run the workflow (await — not fire-and-forget)
-            if batch.mode == "ai":
-                await run_agent_loop(task, browser, screenshot)
-            else:
-                await run_workflow_direct(task, browser, screenshot, resolved)
-
-            # Check task result
-            if task.status == TaskStatus.completed:
-                row_result.status = "completed"
-            else:
-                row_result.status = "failed"
-                row_result.error = task.error or "Task did not complete"
-
-        except Exception as exc:
-            row_result.status = "failed"
-            row_result.error = str(exc)
-            logger.error("Batch row %d failed: %s", i, exc)
-
-        await _broadcast_batch(batch)
+    else:
+        for i in range(len(batch.rows)):
+            if batch.is_cancelled:
+                # Mark remaining rows as skipped
+                for r in batch.results[i:]:
+                    r.status = "skipped"
+                batch.status = "cancelled"
+                await _broadcast_batch(batch)
+                logger.info("Batch %s cancelled at row %d", batch.batch_id, i)
+                return
+            await _run_row(batch, i, workflow, browser, screenshot, tasks)
 
     batch.status = "completed"
     await _broadcast_batch(batch)
@@ -133,6 +130,74 @@ async def run_batch(
     )
 
 
+async def _run_row(
+    batch: BatchState,
+    i: int,
+    workflow: Workflow,
+    browser: BrowserManager,
+    screenshot: ScreenshotCapture,
+    tasks: dict[str, TaskState],
+    *,
+    own_page: bool = False,
+) -> None:
+    """Run a single batch row, optionally on a dedicated page."""
+    row = batch.rows[i]
+    batch.current_index = i
+    row_result = batch.results[i]
+    row_result.status = "running"
+    await _broadcast_batch(batch)
+
+    page = browser.page
+    try:
+        if own_page:
+            page = await browser.context.new_page()
+
+        # Resolve parameters for this row
+        resolved = workflow.resolve(row)
+
+        # Create a task for this row
+        task_id = new_id()
+        instruction = (
+            resolved.to_instruction()
+            if batch.mode == "ai"
+            else f"Batch {batch.workflow_name} [{i + 1}/{len(batch.rows)}]"
+        )
+        task = TaskState(task_id=task_id, instruction=instruction)
+        tasks[task_id] = task
+        row_result.task_id = task_id
+
+        # Navigate to start URL
+        if resolved.start_url:
+            await page.goto(resolved.start_url, wait_until="domcontentloaded")
+
+        # Run the workflow (await — not fire-and-forget)
+        if batch.mode == "ai":
+            await run_agent_loop(task, browser, screenshot)
+        else:
+            await run_workflow_direct(task, browser, screenshot, resolved, page=page)
+
+        # Check task result
+        if task.status is TaskStatus.completed:
+            row_result.status = "completed"
+            batch.completed_count += 1
+        else:
+            row_result.status = "failed"
+            row_result.error = task.error or "Task did not complete"
+            batch.failed_count += 1
+
+    except Exception as exc:
+        row_result.status = "failed"
+        row_result.error = str(exc)
+        batch.failed_count += 1
+        logger.error("Batch row %d failed: %s", i, exc)
+
+    finally:
+        if own_page and page is not browser.page:
+            await page.close()
+
+    await _broadcast_batch(batch)
+
+
 async def _broadcast_batch(batch: BatchState) -> None:
     current_row = {}
     if 0 <= batch.current_index < len(batch.rows):
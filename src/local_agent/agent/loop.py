@@ -1,5 +1,7 @@
 import asyncio
+import time
 import uuid
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
@@ -10,12 +12,25 @@ from local_agent.api.websocket import broadcast
 from local_agent.browser.manager import BrowserManager
 from local_agent.browser.screenshot import ScreenshotCapture
 from local_agent.config import settings
-from local_agent.llm.base import LLMProvider
+from local_agent.llm.base import SCREENSHOT_MEDIA_TYPE, AgentAction, LLMProvider
 from local_agent.llm.factory import create_llm_provider
 from local_agent.utils.logging import logger
 
+# Actions that don't change page state — consecutive ones can run concurrently.
+# "wait" is not one: it exists to let time pass before the next action.
+_PARALLEL_SAFE = frozenset({"screenshot"})
 
-@dataclass
+# Number of identical consecutive actions that counts as being stuck
+STUCK_THRESHOLD = 4
+
+# Status updates within this window are coalesced into one broadcast
+STATUS_FLUSH_DELAY = 0.05
+
+# Strong references to scheduled status flushes (asyncio only keeps weak ones)
+_pending_flushes: set[asyncio.Task] = set()
+
+
+@dataclass(slots=True)
 class TaskState:
     """Tracks the state of a running agent task."""
 
@@ -26,8 +41,9 @@ class TaskState:
     current_action: str | None = None
     result: str | None = None
     error: str | None = None
-    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at_ns: int = field(default_factory=time.time_ns)
     _cancel: bool = False
+    _flush_scheduled: bool = False
 
     def cancel(self) -> None:
         self._cancel = True
@@ -36,14 +52,35 @@ class TaskState:
     def is_cancelled(self) -> bool:
         return self._cancel
 
+    @property
+    def created_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.created_at_ns / 1e9, timezone.utc).isoformat()
+
 
 async def run_agent_loop(
     task: TaskState,
     browser: BrowserManager,
     screenshot: ScreenshotCapture,
+    url: str | None = None,
 ) -> None:
-    """Core agent loop: screenshot → LLM → action → repeat."""
+    """Core agent loop: screenshot → LLM → action → repeat.
+
+    If `url` is given, the page navigates there before the first screenshot.
+    """
     llm = create_llm_provider(screenshot.scaled_width, screenshot.scaled_height)
+    try:
+        await _agent_loop(task, browser, screenshot, llm, url)
+    finally:
+        await llm.aclose()
+
+
+async def _agent_loop(
+    task: TaskState,
+    browser: BrowserManager,
+    screenshot: ScreenshotCapture,
+    llm: LLMProvider,
+    url: str | None,
+) -> None:
     executor = ActionExecutor(browser.page, screenshot)
 
     max_steps = settings.agent_max_steps
@@ -52,11 +89,20 @@ async def run_agent_loop(
     await _broadcast_status(task)
 
     # Navigate to URL if provided (from instruction metadata)
+    if url:
+        try:
+            await browser.page.goto(url, wait_until="domcontentloaded")
+        except Exception as exc:
+            task.status = TaskStatus.failed
+            task.error = f"Navigation error: {exc}"
+            await _broadcast_status(task)
+            return
+
     # Build initial message with a screenshot
     messages: list[dict] = []
 
     # Take initial screenshot
-    b64 = await screenshot.capture(browser.page, save=True)
+    png = await screenshot.capture(browser.page, save=True)
     messages.append(
         {
             "role": "user",
@@ -66,15 +112,15 @@ async def run_agent_loop(
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/png",
-                        "data": b64,
+                        "media_type": SCREENSHOT_MEDIA_TYPE,
+                        "data": png,
                     },
                 },
             ],
         }
     )
 
-    recent_actions: list[str] = []
+    recent_actions: deque[tuple] = deque(maxlen=STUCK_THRESHOLD)
 
     for step in range(max_steps):
         if task.is_cancelled:
@@ -121,7 +167,7 @@ async def run_agent_loop(
         # Execute each action and collect tool results
         tool_results: list[dict] = []
 
-        for action in response.actions:
+        for run in _action_runs(response.actions):
             # Check cancel before each action
             if task.is_cancelled:
                 task.status = TaskStatus.cancelled
@@ -129,46 +175,28 @@ async def run_agent_loop(
                 await _broadcast_status(task)
                 return
 
-            task.current_action = f"{action.action}"
+            task.current_action = ", ".join(a.action for a in run)
             task.steps_completed = step + 1
             await _broadcast_status(task)
 
-            if action.action == "screenshot":
-                # Just take a screenshot, don't execute anything
-                b64 = await screenshot.capture(browser.page, save=True)
-                tool_results.append(llm.build_screenshot_result(action.tool_use_id, b64))
-                continue
-
-            # Check for loop detection
-            action_sig = f"{action.action}:{action.coordinate}:{action.text}"
-            recent_actions.append(action_sig)
-            if len(recent_actions) > 6:
-                recent_actions.pop(0)
-            if _is_stuck(recent_actions):
-                logger.warning("Loop detected — sending error to LLM")
+            if len(run) == 1:
                 tool_results.append(
-                    llm.build_error_result(
-                        action.tool_use_id,
-                        "You appear to be stuck repeating the same action. "
-                        "Try a completely different approach.",
-                    )
+                    await _perform_action(run[0], llm, executor, screenshot, browser, recent_actions)
                 )
-                continue
-
-            # Execute the action
-            error = await executor.execute(action)
-            await asyncio.sleep(settings.agent_step_delay)
-
-            # Take a screenshot after the action
-            b64 = await screenshot.capture(browser.page, save=True)
-
-            if error:
-                tool_results.append(llm.build_error_result(action.tool_use_id, error))
             else:
-                tool_results.append(llm.build_screenshot_result(action.tool_use_id, b64))
+                # gather preserves order, so tool results stay aligned with actions
+                tool_results.extend(
+                    await asyncio.gather(
+                        *(
+                            _perform_action(a, llm, executor, screenshot, browser, recent_actions)
+                            for a in run
+                        )
+                    )
+                )
 
         # Append tool results as a user message
         messages.append({"role": "user", "content": tool_results})
+        _prune_images(messages, settings.agent_image_window)
 
     # Max steps reached
     task.status = TaskStatus.failed
@@ -176,14 +204,122 @@ async def run_agent_loop(
     await _broadcast_status(task)
 
 
-def _is_stuck(recent: list[str]) -> bool:
-    """Detect if the last 4+ actions are identical."""
-    if len(recent) < 4:
-        return False
-    return len(set(recent[-4:])) == 1
+async def _perform_action(
+    action: AgentAction,
+    llm: LLMProvider,
+    executor: ActionExecutor,
+    screenshot: ScreenshotCapture,
+    browser: BrowserManager,
+    recent_actions: deque[tuple],
+) -> dict:
+    """Execute one action and return its tool_result block."""
+    if action.action == "screenshot":
+        # Just take a screenshot, don't execute anything — reuses the
+        # previous capture if no action has touched the page since
+        png = await screenshot.capture_if_dirty(browser.page, save=True)
+        return llm.build_screenshot_result(action.tool_use_id, png)
+
+    # Check for loop detection
+    action_sig = (action.action, action.coordinate, action.text)
+    recent_actions.append(action_sig)
+    if _is_stuck(recent_actions):
+        logger.warning("Loop detected — sending error to LLM")
+        return llm.build_error_result(
+            action.tool_use_id,
+            "You appear to be stuck repeating the same action. "
+            "Try a completely different approach.",
+        )
+
+    # Execute the action
+    error = await executor.execute(action)
+    await asyncio.sleep(settings.agent_step_delay)
+
+    # Take a screenshot after the action
+    png = await screenshot.capture_if_dirty(browser.page, save=True)
+
+    if error:
+        return llm.build_error_result(action.tool_use_id, error)
+    return llm.build_screenshot_result(action.tool_use_id, png)
+
+
+def _action_runs(actions: list[AgentAction]) -> list[list[AgentAction]]:
+    """Group actions into runs that may execute together.
+
+    Consecutive parallel-safe actions form one run; every other action is a
+    run of its own so stateful input stays strictly ordered.
+    """
+    runs: list[list[AgentAction]] = []
+    for action in actions:
+        if (
+            action.action in _PARALLEL_SAFE
+            and runs
+            and runs[-1][-1].action in _PARALLEL_SAFE
+        ):
+            runs[-1].append(action)
+        else:
+            runs.append([action])
+    return runs
+
+
+def _prune_images(messages: list[dict], keep: int) -> None:
+    """Replace all but the newest `keep` screenshots with a text placeholder.
+
+    The LLM works from the latest screenshot plus the conversation text, so
+    re-sending every earlier image only grows upload size and token cost.
+    """
+    seen = 0
+    for idx in range(len(messages) - 1, -1, -1):
+        content = messages[idx]["content"]
+        if not isinstance(content, list):
+            continue
+        for blocks in _block_lists(content):
+            for i in range(len(blocks) - 1, -1, -1):
+                block = blocks[i]
+                if isinstance(block, dict) and block.get("type") == "image":
+                    seen += 1
+                    if seen > keep:
+                        blocks[i] = {
+                            "type": "text",
+                            "text": f"[screenshot from step {idx // 2} omitted]",
+                        }
+
+
+def _block_lists(content: list) -> list[list]:
+    """Content lists that can hold image blocks, newest first."""
+    lists = [content]
+    lists.extend(
+        block["content"]
+        for block in content
+        if isinstance(block, dict)
+        and block.get("type") == "tool_result"
+        and isinstance(block.get("content"), list)
+    )
+    lists.reverse()
+    return lists
+
+
+def _is_stuck(recent: deque[tuple]) -> bool:
+    """Detect if the last STUCK_THRESHOLD actions are identical."""
+    return len(recent) == STUCK_THRESHOLD and len(set(recent)) == 1
 
 
 async def _broadcast_status(task: TaskState) -> None:
+    """Schedule a status broadcast; calls within STATUS_FLUSH_DELAY coalesce.
+
+    The frame is built when the flush runs, so it always carries the latest
+    state of the task.
+    """
+    if task._flush_scheduled:
+        return
+    task._flush_scheduled = True
+    flush = asyncio.create_task(_flush_status(task))
+    _pending_flushes.add(flush)
+    flush.add_done_callback(_pending_flushes.discard)
+
+
+async def _flush_status(task: TaskState) -> None:
+    await asyncio.sleep(STATUS_FLUSH_DELAY)
+    task._flush_scheduled = False
     await broadcast(
         {
             "type": "task_status",
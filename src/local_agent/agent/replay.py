@@ -23,12 +23,27 @@ async def run_workflow_direct(
     browser: BrowserManager,
     screenshot: ScreenshotCapture,
     workflow: Workflow,
+    page: Page | None = None,
+    url: str | None = None,
 ) -> None:
-    """Execute workflow steps directly via Playwright — no AI, no cost."""
-    page = browser.page
+    """Execute workflow steps directly via Playwright — no AI, no cost.
+
+    Runs on `page` when given (batch workers), otherwise the main page.
+    If `url` is given, the page navigates there before the first step.
+    """
+    page = page or browser.page
     task.status = TaskStatus.running
     await _broadcast_status(task)
 
+    if url:
+        try:
+            await page.goto(url, wait_until="domcontentloaded")
+        except Exception as exc:
+            task.status = TaskStatus.failed
+            task.error = f"Navigation error: {exc}"
+            await _broadcast_status(task)
+            return
+
     for i, step in enumerate(workflow.steps):
         if task.is_cancelled:
             task.status = TaskStatus.cancelled
@@ -36,10 +51,11 @@ async def run_workflow_direct(
             await _broadcast_status(task)
             return
 
-        task.current_action = step.description or step.action
+        description = step.describe()
+        task.current_action = description or step.action
         task.steps_completed = i + 1
         await _broadcast_status(task)
-        logger.info("Replay step %d/%d: %s", i + 1, len(workflow.steps), step.description)
+        logger.info("Replay step %d/%d: %s", i + 1, len(workflow.steps), description)
 
         error = await _execute_step(page, step)
         if error:
@@ -64,25 +80,18 @@ async def run_workflow_direct(
 
 async def _execute_step(page: Page, step: WorkflowStep) -> str | None:
     """Execute a single workflow step. Returns error string or None on success."""
+    handler = _STEP_HANDLERS.get(step.action)
+    if handler is None:
+        return f"Unknown action: {step.action}"
     try:
-        if step.action == "click":
-            return await _do_click(page, step)
-        elif step.action == "type":
-            return await _do_type(page, step)
-        elif step.action == "key":
-            return await _do_key(page, step)
-        elif step.action == "navigate":
-            await page.goto(step.url, wait_until="domcontentloaded")
-            return None
-        else:
-            return f"Unknown action: {step.action}"
+        return await handler(page, step)
     except Exception as e:
         return str(e)
 
 
 async def _do_click(page: Page, step: WorkflowStep) -> str | None:
     """Click element by locator, fall back to coordinates."""
-    locator = _find_element(page, step.element)
+    locator = _find_element(page, step)
     if locator:
         try:
             await locator.click(timeout=5000)
@@ -99,7 +108,7 @@ async def _do_click(page: Page, step: WorkflowStep) -> str | None:
 
 async def _do_type(page: Page, step: WorkflowStep) -> str | None:
     """Type text into a field by locator, fall back to coordinates."""
-    locator = _find_element(page, step.element)
+    locator = _find_element(page, step)
     if locator:
         try:
             await locator.click(timeout=5000)
@@ -132,49 +141,82 @@ async def _do_key(page: Page, step: WorkflowStep) -> str | None:
     return None
 
 
-def _find_element(page: Page, el: ElementInfo):
+async def _do_navigate(page: Page, step: WorkflowStep) -> str | None:
+    """Navigate to the step's URL."""
+    await page.goto(step.url, wait_until="domcontentloaded")
+    return None
+
+
+_STEP_HANDLERS = {
+    "click": _do_click,
+    "type": _do_type,
+    "key": _do_key,
+    "navigate": _do_navigate,
+}
+
+
+def _find_element(page: Page, step: WorkflowStep):
     """Try to find an element using Playwright locators. Returns locator or None."""
-    if not el.tag and not el.aria_label and not el.text and not el.role:
+    spec = _locator_spec(step)
+    if not spec:
         return None
 
+    kind, *args = spec
+    if kind == "role":
+        return page.get_by_role(args[0], name=args[1])
+    if kind == "label":
+        return page.get_by_label(args[0])
+    if kind == "placeholder":
+        return page.get_by_placeholder(args[0])
+    return page.get_by_text(args[0], exact=True)
+
+
+def _locator_spec(step: WorkflowStep) -> tuple[str, ...]:
+    """Pick the locator strategy for a step once and cache it on the step."""
+    if step._locator_spec is None:
+        step._locator_spec = _build_locator_spec(step.element)
+    return step._locator_spec
+
+
+def _build_locator_spec(el: ElementInfo) -> tuple[str, ...]:
+    if not el.tag and not el.aria_label and not el.text and not el.role:
+        return ()
+
     # Strategy 1: role + name (most reliable for buttons, links, etc.)
     if el.role and (el.aria_label or el.text):
-        name = el.aria_label or el.text
-        try:
-            return page.get_by_role(el.role, name=name)
-        except Exception:
-            pass
+        return ("role", el.role, el.aria_label or el.text)
 
     # Strategy 2: aria-label directly
     if el.aria_label:
-        return page.get_by_label(el.aria_label)
+        return ("label", el.aria_label)
 
     # Strategy 3: placeholder (for inputs)
     if el.placeholder:
-        return page.get_by_placeholder(el.placeholder)
+        return ("placeholder", el.placeholder)
 
-    # Strategy 4: role + text for buttons/links without aria-label
-    if el.text and el.role:
-        try:
-            return page.get_by_role(el.role, name=el.text)
-        except Exception:
-            pass
-
-    # Strategy 5: exact text match
+    # Strategy 4: exact text match
     if el.text:
-        return page.get_by_text(el.text, exact=True)
+        return ("text", el.text)
 
-    return None
+    return ()
+
+
+def warm_locator_specs(workflow: Workflow) -> None:
+    """Compute locator specs up front so resolved copies inherit them."""
+    for step in workflow.steps:
+        _locator_spec(step)
+
+
+_KEY_MAP = {
+    "enter": "Enter",
+    "tab": "Tab",
+    "escape": "Escape",
+    "backspace": "Backspace",
+    "delete": "Delete",
+    "space": " ",
+}
 
 
 def _normalize_key(key: str) -> str:
     """Normalize key names for Playwright."""
-    mapping = {
-        "enter": "Enter",
-        "tab": "Tab",
-        "escape": "Escape",
-        "backspace": "Backspace",
-        "delete": "Delete",
-        "space": " ",
-    }
-    return mapping.get(key.lower(), key)
+    return _KEY_MAP.get(key.lower(), key)
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
 import copy
+import json
+import os
 import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
 
 import yaml
 
 from local_agent.config import settings
 from local_agent.utils.logging import logger
 
+# Prefer the libyaml-backed loader/dumper; the pure-Python ones are much slower
+Loader = getattr(yaml, "CSafeLoader", None)
+Dumper = getattr(yaml, "CSafeDumper", None)
+if Loader is None or Dumper is None:
+    logger.warning("libyaml not available — falling back to pure-Python YAML")
+    Loader = yaml.SafeLoader
+    Dumper = yaml.SafeDumper
+
 
 @dataclass
 class WorkflowParameter:
@@ -40,8 +54,13 @@ def _resolve_text(template: str, params: dict[str, str]) -> str:
     return re.sub(r'\{\{(\w+)\}\}', lambda m: params.get(m.group(1), m.group(0)), template)
 
 
-@dataclass
+@dataclass(slots=True)
 class ElementInfo:
+    """Identifying attributes of a recorded element.
+
+    from_dict interns instances, so steps may share one — treat as read-only.
+    """
+
     tag: str = ""
     text: str = ""
     aria_label: str = ""
@@ -54,44 +73,69 @@ class ElementInfo:
     contenteditable: bool = False
     parent_context: str = ""
     label: str = ""
+    # to_dict() result; safe to keep since instances are read-only
+    _dict_cache: dict | None = field(default=None, init=False, repr=False, compare=False)
+
+    # All string fields, in to_dict order (everything except contenteditable)
+    _STR_FIELDS = (
+        "tag", "text", "aria_label", "placeholder", "role", "name",
+        "input_type", "tooltip", "title", "parent_context", "label",
+    )
 
     def to_dict(self) -> dict:
-        d = {k: v for k, v in {
-            "tag": self.tag,
-            "text": self.text,
-            "aria_label": self.aria_label,
-            "placeholder": self.placeholder,
-            "role": self.role,
-            "name": self.name,
-            "input_type": self.input_type,
-            "tooltip": self.tooltip,
-            "title": self.title,
-            "parent_context": self.parent_context,
-            "label": self.label,
-        }.items() if v}
+        """Non-empty fields as a dict. The result is cached — don't mutate it."""
+        if self._dict_cache is not None:
+            return self._dict_cache
+        d: dict = {}
+        if self.tag:
+            d["tag"] = self.tag
+        if self.text:
+            d["text"] = self.text
+        if self.aria_label:
+            d["aria_label"] = self.aria_label
+        if self.placeholder:
+            d["placeholder"] = self.placeholder
+        if self.role:
+            d["role"] = self.role
+        if self.name:
+            d["name"] = self.name
+        if self.input_type:
+            d["input_type"] = self.input_type
+        if self.tooltip:
+            d["tooltip"] = self.tooltip
+        if self.title:
+            d["title"] = self.title
+        if self.parent_context:
+            d["parent_context"] = self.parent_context
+        if self.label:
+            d["label"] = self.label
         if self.contenteditable:
             d["contenteditable"] = True
+        self._dict_cache = d
         return d
 
     @classmethod
     def from_dict(cls, data: dict) -> ElementInfo:
-        return cls(
-            tag=data.get("tag", ""),
-            text=data.get("text", ""),
-            aria_label=data.get("aria_label", ""),
-            placeholder=data.get("placeholder", ""),
-            role=data.get("role", ""),
-            name=data.get("name", ""),
-            input_type=data.get("input_type", ""),
-            tooltip=data.get("tooltip", ""),
-            title=data.get("title", ""),
-            contenteditable=data.get("contenteditable", False),
-            parent_context=data.get("parent_context", ""),
-            label=data.get("label", ""),
-        )
+        get = data.get
+        key = tuple(get(k, "") for k in cls._STR_FIELDS) + (get("contenteditable", False),)
+        try:
+            return _intern_element(key)
+        except TypeError:  # unhashable value in an odd payload
+            return _build_element(key)
+
+
+def _build_element(key: tuple) -> ElementInfo:
+    return ElementInfo(
+        **dict(zip(ElementInfo._STR_FIELDS, key)),
+        contenteditable=key[-1],
+    )
 
 
-@dataclass
+# Consecutive recorder events usually target the same element
+_intern_element = lru_cache(maxsize=512)(_build_element)
+
+
+@dataclass(slots=True)
 class WorkflowStep:
     action: str  # click, type, key, navigate
     description: str = ""
@@ -100,11 +144,16 @@ class WorkflowStep:
     key: str = ""
     url: str = ""
     element: ElementInfo = field(default_factory=ElementInfo)
+    # Cached Playwright locator query, filled in by replay (() = no locator)
+    _locator_spec: tuple[str, ...] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def to_dict(self) -> dict:
         d: dict = {"action": self.action}
-        if self.description:
-            d["description"] = self.description
+        description = self.describe()
+        if description:
+            d["description"] = description
         if self.coordinates:
             d["coordinates"] = self.coordinates
         if self.text:
@@ -115,9 +164,20 @@ class WorkflowStep:
             d["url"] = self.url
         elem = self.element.to_dict()
         if elem:
-            d["element"] = elem
+            # Copy: elements are shared, and a shared dict would become a YAML alias
+            d["element"] = dict(elem)
         return d
 
+    def describe(self) -> str:
+        """Return the step's description, generating it on first use.
+
+        Recorded steps are created without one; it is only built when
+        something (YAML, API response, replay progress) actually reads it.
+        """
+        if not self.description:
+            self.description = _describe_step(self)
+        return self.description
+
     @classmethod
     def from_dict(cls, data: dict) -> WorkflowStep:
         elem = ElementInfo.from_dict(data.get("element", {}))
@@ -132,7 +192,7 @@ class WorkflowStep:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class Workflow:
     name: str
     description: str = ""
@@ -142,8 +202,12 @@ class Workflow:
     recorded_at: str = field(
         default_factory=lambda: datetime.now(timezone.utc).isoformat()
     )
+    # Built by to_instruction(); call invalidate() after mutating the workflow
+    _instruction_cache: str | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
-    def to_yaml(self) -> str:
+    def _yaml_data(self) -> dict:
         data: dict = {
             "name": self.name,
             "description": self.description,
@@ -153,11 +217,37 @@ class Workflow:
         if self.parameters:
             data["parameters"] = [p.to_dict() for p in self.parameters]
         data["steps"] = [s.to_dict() for s in self.steps]
-        return yaml.dump(data, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        return data
+
+    def to_yaml(self, stream=None) -> str | None:
+        """Serialize to YAML; writes to `stream` if given, else returns a string."""
+        if not self.steps and not self.parameters:
+            header = (self.name, self.description, self.recorded_at, self.start_url)
+            if all(isinstance(v, str) and v.isascii() and v.isprintable() for v in header):
+                # Trivial workflow: JSON-quoted strings are valid YAML scalars
+                text = (
+                    f"name: {json.dumps(self.name)}\n"
+                    f"description: {json.dumps(self.description)}\n"
+                    f"recorded_at: {json.dumps(self.recorded_at)}\n"
+                    f"start_url: {json.dumps(self.start_url)}\n"
+                    "steps: []\n"
+                )
+                if stream is None:
+                    return text
+                stream.write(text)
+                return None
+        return yaml.dump(
+            self._yaml_data(),
+            stream,
+            Dumper=Dumper,
+            default_flow_style=False,
+            allow_unicode=True,
+            sort_keys=False,
+        )
 
     @classmethod
     def from_yaml(cls, content: str) -> Workflow:
-        data = yaml.safe_load(content)
+        data = yaml.load(content, Loader=Loader)
         steps = [WorkflowStep.from_dict(s) for s in data.get("steps", [])]
         params = [WorkflowParameter.from_dict(p) for p in data.get("parameters", [])]
         return cls(
@@ -171,6 +261,9 @@ class Workflow:
 
     def to_instruction(self) -> str:
         """Convert workflow steps to a natural-language instruction for the AI agent."""
+        if self._instruction_cache is not None:
+            return self._instruction_cache
+
         lines = []
         if self.description:
             lines.append(f"Task: {self.description}")
@@ -187,14 +280,19 @@ class Workflow:
         lines.append("")
 
         for i, step in enumerate(self.steps, 1):
-            lines.append(self._step_to_instruction(i, step))
+            self._step_to_instruction(i, step, lines)
 
         lines.append("")
         lines.append(
             "After completing ALL steps above, report that the task is done. "
             "Do not add extra steps that were not listed."
         )
-        return "\n".join(lines)
+        self._instruction_cache = "\n".join(lines)
+        return self._instruction_cache
+
+    def invalidate(self) -> None:
+        """Drop cached derived data after steps/description/start_url change."""
+        self._instruction_cache = None
 
     def resolve(self, params: dict[str, str]) -> Workflow:
         """Return a copy with all {{var}} placeholders resolved using params.
@@ -218,6 +316,7 @@ class Workflow:
                 step.description = _resolve_text(step.description, merged)
         if resolved.start_url:
             resolved.start_url = _resolve_text(resolved.start_url, merged)
+        resolved.invalidate()
         return resolved
 
     def validate_parameters(self, params: dict[str, str]) -> None:
@@ -230,38 +329,36 @@ class Workflow:
             raise ValueError(f"Missing required parameters: {', '.join(missing)}")
 
     @staticmethod
-    def _step_to_instruction(num: int, step: WorkflowStep) -> str:
-        """Generate a detailed instruction line for a single step."""
+    def _step_to_instruction(num: int, step: WorkflowStep, out: list[str]) -> None:
+        """Append the detailed instruction line(s) for a single step to `out`."""
         el = step.element
-        parts = []
 
         if step.action == "click":
             # Build target description with multiple identifiers
             target = _describe_element_detailed(el)
-            parts.append(f"{num}. CLICK: {target}")
+            out.append(f"{num}. CLICK: {target}")
             if step.coordinates:
-                parts.append(f"   (approximate position: x={step.coordinates[0]}, y={step.coordinates[1]})")
+                out.append(f"   (approximate position: x={step.coordinates[0]}, y={step.coordinates[1]})")
 
         elif step.action == "type":
             target = _describe_field(el)
-            parts.append(f"{num}. TYPE: '{step.text}' into {target}")
+            out.append(f"{num}. TYPE: '{step.text}' into {target}")
             if el.contenteditable:
-                parts.append("   (this is a rich text field, not a regular input)")
+                out.append("   (this is a rich text field, not a regular input)")
 
         elif step.action == "key":
-            parts.append(f"{num}. PRESS: {step.key} key")
+            out.append(f"{num}. PRESS: {step.key} key")
 
         elif step.action == "navigate":
-            parts.append(f"{num}. NAVIGATE: Go to {step.url}")
-
-        return "\n".join(parts)
+            out.append(f"{num}. NAVIGATE: Go to {step.url}")
 
     def save(self, directory: Path | None = None) -> Path:
         """Save workflow as YAML file."""
         d = directory or settings.workflows_dir
         d.mkdir(parents=True, exist_ok=True)
         path = d / f"{self.name}.yaml"
-        path.write_text(self.to_yaml(), encoding="utf-8")
+        with path.open("w", encoding="utf-8") as f:
+            self.to_yaml(f)
         logger.info("Workflow saved to %s", path)
         return path
 
@@ -274,17 +371,23 @@ class Workflow:
         return cls.from_yaml(path.read_text(encoding="utf-8"))
 
     @classmethod
-    def list_all(cls, directory: Path | None = None) -> list[Workflow]:
-        d = directory or settings.workflows_dir
-        if not d.exists():
-            return []
-        workflows = []
-        for path in sorted(d.glob("*.yaml")):
-            try:
-                workflows.append(cls.from_yaml(path.read_text(encoding="utf-8")))
-            except Exception as e:
-                logger.warning("Failed to load workflow %s: %s", path.name, e)
-        return workflows
+    def list_all(cls, directory: Path | None = None) -> Iterator[Workflow]:
+        """Yield every saved workflow, sorted by file name.
+
+        Files are read and parsed on a small thread pool. Callers that serve
+        the list repeatedly cache the result themselves (see routes).
+        """
+        paths = _workflow_paths(directory)
+        if not paths:
+            return
+        workers = min(8, os.cpu_count() or 4, len(paths))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            loaded = list(ex.map(_load_path, paths))
+        for path, result in zip(paths, loaded):
+            if isinstance(result, Exception):
+                logger.warning("Failed to load workflow %s: %s", path.name, result)
+            else:
+                yield result
 
     @classmethod
     def delete(cls, name: str, directory: Path | None = None) -> bool:
@@ -297,21 +400,72 @@ class Workflow:
         return False
 
 
+def _workflow_paths(directory: Path | None) -> list[Path]:
+    """Return the workflow files in a directory, sorted by name."""
+    d = directory or settings.workflows_dir
+    if not d.exists():
+        return []
+    with os.scandir(d) as it:
+        names = sorted(e.name for e in it if e.name.endswith(".yaml") and e.is_file())
+    return [d / n for n in names]
+
+
+def _load_path(path: Path) -> Workflow | Exception:
+    """Load one workflow file, returning the exception instead of raising."""
+    try:
+        return Workflow.from_yaml(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        return e
+
+
+# (attribute, template) pairs in priority order; the first non-empty attribute wins
+_SHORT_DESC = (
+    ("aria_label", "'{}'"),
+    ("tooltip", "'{}'"),
+    ("title", "'{}'"),
+    ("text", "'{}'"),
+    ("placeholder", "'{}' field"),
+    ("role", "{}"),
+)
+
+_DETAILED_DESC = (
+    ("aria_label", "the element labeled '{}'"),
+    ("tooltip", "the element with tooltip '{}'"),
+    ("title", "the element titled '{}'"),
+    ("text", "the element with text '{}'"),
+    ("role", "the {} element"),
+)
+
+_FIELD_DESC = (
+    ("aria_label", "the '{}' field"),
+    ("label", "the '{}' field"),
+    ("placeholder", "the field with placeholder '{}'"),
+    ("name", "the '{}' field"),
+    ("parent_context", "the input field inside '{}'"),
+)
+
+
+def _describe_step(step: WorkflowStep) -> str:
+    """Generate the human-readable description of a recorded step."""
+    if step.action == "navigate":
+        return f"Navigate to {step.url}"
+    if step.action == "click":
+        return f"Click {_describe_element(step.element)}"
+    if step.action == "type":
+        return f"Type '{step.text}' in {_describe_element(step.element)}"
+    if step.action == "key":
+        return f"Press {step.key}"
+    return ""
+
+
 def _describe_element(element: ElementInfo) -> str:
     """Generate a human-readable description of an element (short version for YAML)."""
-    if element.aria_label:
-        return f"'{element.aria_label}'"
-    if element.tooltip:
-        return f"'{element.tooltip}'"
-    if element.title:
-        return f"'{element.title}'"
-    if element.text:
-        text = element.text[:40] + ("..." if len(element.text) > 40 else "")
-        return f"'{text}'"
-    if element.placeholder:
-        return f"'{element.placeholder}' field"
-    if element.role:
-        return f"{element.role}"
+    for attr, tpl in _SHORT_DESC:
+        v = getattr(element, attr)
+        if v:
+            if attr == "text" and len(v) > 40:
+                v = v[:40] + "..."
+            return tpl.format(v)
     return f"{element.tag or 'element'}"
 
 
@@ -320,17 +474,11 @@ def _describe_element_detailed(element: ElementInfo) -> str:
     identifiers = []
 
     # Primary identifier
-    if element.aria_label:
-        identifiers.append(f"the element labeled '{element.aria_label}'")
-    elif element.tooltip:
-        identifiers.append(f"the element with tooltip '{element.tooltip}'")
-    elif element.title:
-        identifiers.append(f"the element titled '{element.title}'")
-    elif element.text:
-        text = element.text[:50]
-        identifiers.append(f"the element with text '{text}'")
-    elif element.role:
-        identifiers.append(f"the {element.role} element")
+    for attr, tpl in _DETAILED_DESC:
+        v = getattr(element, attr)
+        if v:
+            identifiers.append(tpl.format(v[:50] if attr == "text" else v))
+            break
     else:
         identifiers.append(f"the {element.tag or 'element'}")
 
@@ -345,19 +493,33 @@ def _describe_element_detailed(element: ElementInfo) -> str:
 
 def _describe_field(element: ElementInfo) -> str:
     """Generate a detailed description of an input field for AI instruction."""
-    if element.aria_label:
-        return f"the '{element.aria_label}' field"
-    if element.label:
-        return f"the '{element.label}' field"
-    if element.placeholder:
-        return f"the field with placeholder '{element.placeholder}'"
-    if element.name:
-        return f"the '{element.name}' field"
-    if element.parent_context:
-        return f"the input field inside '{element.parent_context}'"
+    for attr, tpl in _FIELD_DESC:
+        v = getattr(element, attr)
+        if v:
+            return tpl.format(v)
     return "the text field"
 
 
+# A hash fragment carrying a long random-looking compose ID (>20 chars)
+_EPHEMERAL_RE = re.compile(r"compose=.{21}", re.DOTALL)
+
+# Key presses treated as typo corrections while recording
+_TYPO_KEYS = frozenset(("Backspace", "Delete"))
+
+
+class _Event(NamedTuple):
+    """A raw recorder event with its fields pulled out once."""
+
+    type: str
+    element: dict
+    key: str
+    text: str
+    url: str
+    x: int
+    y: int
+    ident: tuple  # see _elem_id
+
+
 def process_raw_events(events: list[dict], start_url: str = "") -> list[WorkflowStep]:
     """Convert raw JS events into clean workflow steps.
 
@@ -367,60 +529,68 @@ def process_raw_events(events: list[dict], start_url: str = "") -> list[Workflow
     - Skip Backspace/Delete (typo corrections) when followed by more typing
     - Skip Gmail-style hash navigations with unique compose IDs
     - Deduplicate: if we already typed in a field, skip duplicate types with same/less text
-    - Generate human-readable descriptions
+    - Descriptions are left empty and generated on demand (WorkflowStep.describe)
     """
     if not events:
         return []
 
+    # Parse each event once instead of repeated dict lookups in the lookaheads
+    evs = [
+        _Event(
+            e.get("type", ""),
+            e.get("element", {}),
+            e.get("key", ""),
+            e.get("text", ""),
+            e.get("url", ""),
+            e.get("x", 0),
+            e.get("y", 0),
+            _elem_id(e.get("element", {})),
+        )
+        for e in events
+    ]
+    n = len(evs)
+
     # Phase 1: collect raw steps
     raw_steps: list[WorkflowStep] = []
 
     i = 0
-    while i < len(events):
-        event = events[i]
-        etype = event.get("type", "")
+    while i < n:
+        event = evs[i]
+        etype = event.type
 
         if etype == "navigate":
-            url = event.get("url", "")
+            url = event.url
             # Skip hash-only navigations with unique IDs (Gmail compose etc)
             if url and url != start_url and not _is_ephemeral_navigation(url, start_url):
-                raw_steps.append(WorkflowStep(
-                    action="navigate",
-                    url=url,
-                    description=f"Navigate to {url}",
-                ))
+                raw_steps.append(WorkflowStep(action="navigate", url=url))
 
         elif etype == "click":
             # Check if next non-key event is a type on the same element → skip click
-            next_relevant = _next_non_backspace(events, i + 1)
-            if next_relevant and next_relevant.get("type") == "type":
-                if _elements_match(event.get("element", {}), next_relevant.get("element", {})):
+            next_relevant = _next_non_backspace(evs, i + 1)
+            if next_relevant and next_relevant.type == "type":
+                if _elements_match(event.ident, next_relevant.ident):
                     i += 1
                     continue
 
-            elem = ElementInfo.from_dict(event.get("element", {}))
-            coords = [event.get("x", 0), event.get("y", 0)]
-            target = _describe_element(elem)
-            raw_steps.append(WorkflowStep(
-                action="click",
-                coordinates=coords,
-                element=elem,
-                description=f"Click {target}",
-            ))
+            elem = ElementInfo.from_dict(event.element)
+            coords = [event.x, event.y]
+            raw_steps.append(WorkflowStep(action="click", coordinates=coords, element=elem))
 
         elif etype == "type":
-            elem_data = event.get("element", {})
-            text = event.get("text", "")
+            elem_data = event.element
+            elem_id = event.ident
+            text = event.text
 
             # Look ahead: merge consecutive types on same element, skip interleaved backspaces
             j = i + 1
-            while j < len(events):
-                ntype = events[j].get("type", "")
-                if ntype == "type" and _elements_match(elem_data, events[j].get("element", {})):
-                    text = events[j].get("text", "")
-                    elem_data = events[j].get("element", {})
+            while j < n:
+                nxt = evs[j]
+                if nxt.type == "type" and _elements_match(elem_id, nxt.ident):
+                    text = nxt.text
+                    elem_data = nxt.element
+                    elem_id = nxt.ident
                     j += 1
-                elif ntype == "key" and events[j].get("key") in ("Backspace", "Delete"):
+                elif nxt.type == "key" and nxt.key in _TYPO_KEYS:
                     # Skip backspace between types — it's a typo correction
                     j += 1
                 else:
@@ -429,28 +599,17 @@ def process_raw_events(events: list[dict], start_url: str = "") -> list[Workflow
 
             if text:
                 elem = ElementInfo.from_dict(elem_data)
-                target = _describe_element(elem)
-                raw_steps.append(WorkflowStep(
-                    action="type",
-                    text=text,
-                    element=elem,
-                    description=f"Type '{text}' in {target}",
-                ))
+                raw_steps.append(WorkflowStep(action="type", text=text, element=elem))
 
         elif etype == "key":
-            key = event.get("key", "")
+            key = event.key
             # Skip standalone backspace/delete — likely typo corrections
-            if key in ("Backspace", "Delete"):
+            if key in _TYPO_KEYS:
                 i += 1
                 continue
             if key:
-                elem = ElementInfo.from_dict(event.get("element", {}))
-                raw_steps.append(WorkflowStep(
-                    action="key",
-                    key=key,
-                    element=elem,
-                    description=f"Press {key}",
-                ))
+                elem = ElementInfo.from_dict(event.element)
+                raw_steps.append(WorkflowStep(action="key", key=key, element=elem))
 
         i += 1
 
@@ -461,53 +620,49 @@ def process_raw_events(events: list[dict], start_url: str = "") -> list[Workflow
 def _is_ephemeral_navigation(url: str, start_url: str) -> bool:
     """Detect navigations that are just URL hash changes with unique IDs (e.g. Gmail compose)."""
     # Strip everything after # and compare base URLs
-    base_new = url.split("#")[0]
-    base_start = start_url.split("#")[0] if start_url else ""
+    base_new, _, fragment = url.partition("#")
+    base_start = start_url.partition("#")[0] if start_url else ""
     if base_new != base_start:
         return False
-    # If the hash part contains a long random-looking string (>20 chars), it's ephemeral
-    fragment = url.split("#", 1)[1] if "#" in url else ""
     # Gmail compose IDs look like: inbox?compose=DmwnWslzCnrMjZ...
-    if "compose=" in fragment:
-        compose_id = fragment.split("compose=", 1)[1]
-        if len(compose_id) > 20:
-            return True
-    return False
+    return _EPHEMERAL_RE.search(fragment) is not None
 
 
-def _next_non_backspace(events: list[dict], start: int) -> dict | None:
+def _next_non_backspace(events: list[_Event], start: int) -> _Event | None:
     """Find next event that isn't a Backspace/Delete key press."""
     for j in range(start, min(start + 5, len(events))):
-        if events[j].get("type") == "key" and events[j].get("key") in ("Backspace", "Delete"):
+        ev = events[j]
+        if ev.type == "key" and ev.key in _TYPO_KEYS:
             continue
-        return events[j]
+        return ev
     return None
 
 
 def _deduplicate_steps(steps: list[WorkflowStep]) -> list[WorkflowStep]:
     """Remove redundant steps: duplicate types on same field, clicks on field we already typed in."""
-    result: list[WorkflowStep] = []
+    result: list[WorkflowStep | None] = []
     # Track which fields have been typed into (by aria_label)
     typed_fields: dict[str, str] = {}  # field_id -> latest text
+    typed_idx: dict[str, int] = {}  # field_id -> index of its type step in result
 
     for step in steps:
         if step.action == "type":
-            field_id = step.element.aria_label or step.element.name or step.element.placeholder or ""
+            field_id = _field_id(step.element)
             if field_id:
-                if field_id in typed_fields and typed_fields[field_id] == step.text:
+                if typed_fields.get(field_id) == step.text:
                     # Exact duplicate type — skip
                     continue
                 typed_fields[field_id] = step.text
-                # Remove any previous type step for this field from result
-                result = [s for s in result if not (
-                    s.action == "type"
-                    and (s.element.aria_label or s.element.name or s.element.placeholder or "") == field_id
-                )]
+                # Drop the previous type step for this field; the new one goes last
+                prev = typed_idx.get(field_id)
+                if prev is not None:
+                    result[prev] = None
+                typed_idx[field_id] = len(result)
             result.append(step)
 
         elif step.action == "click":
             # Skip click on a field we're about to type in (or already typed in)
-            click_field = step.element.aria_label or step.element.name or step.element.placeholder or ""
+            click_field = _field_id(step.element)
             if click_field and click_field in typed_fields:
                 continue
             result.append(step)
@@ -515,14 +670,26 @@ def _deduplicate_steps(steps: list[WorkflowStep]) -> list[WorkflowStep]:
         else:
             result.append(step)
 
-    return result
+    return [s for s in result if s is not None]
 
 
-def _elements_match(a: dict, b: dict) -> bool:
-    """Check if two element info dicts refer to the same element."""
-    for key in ("aria_label", "name", "placeholder", "label", "tooltip"):
-        va = a.get(key, "")
-        vb = b.get(key, "")
-        if va and vb and va == vb:
-            return True
-    return False
+def _field_id(element: ElementInfo) -> str:
+    """Identify an input field for deduplication."""
+    return element.aria_label or element.name or element.placeholder or ""
+
+
+def _elem_id(d: dict) -> tuple:
+    """Identity key of an element info dict, compared by _elements_match."""
+    get = d.get
+    return (
+        get("aria_label", ""),
+        get("name", ""),
+        get("placeholder", ""),
+        get("label", ""),
+        get("tooltip", ""),
+    )
+
+
+def _elements_match(a: tuple, b: tuple) -> bool:
+    """Check if two element identity keys refer to the same element."""
+    return any(x and x == y for x, y in zip(a, b))
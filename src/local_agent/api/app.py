@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -6,7 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
-from local_agent.browser.manager import BrowserManager
+from local_agent.browser.manager import BrowserManager, browser_pool
 from local_agent.browser.screenshot import ScreenshotCapture
 from local_agent.browser.session import get_session_path_if_exists
 from local_agent.utils.logging import logger
@@ -27,12 +28,35 @@ async def lifespan(app: FastAPI):
     app.state.screenshot = screenshot_capture
     app.state.tasks = {}  # task_id -> TaskState
     app.state.batches = {}  # batch_id -> BatchState
+    app.state.running_tasks = 0  # background task jobs alive (see routes._spawn)
+    app.state.running_batches = 0
+    app.state.last_png = b""  # last /screenshot capture (see routes.screenshot)
+    app.state.last_png_etag = ""
+    app.state.last_png_ts = float("-inf")
+
+    # Background jobs go through one queue and worker; admissions are serialized
+    from local_agent.api.routes import job_worker
+
+    app.state.job_queue = asyncio.Queue()
+    app.state.admit_lock = asyncio.Lock()
+    worker = asyncio.create_task(job_worker(app.state))
     app.state.recorder = None  # BrowserRecorder | None
 
     logger.info("App started — browser ready")
     yield
 
+    # Let a running job finish its cleanup before the browser goes away
+    worker.cancel()
+    try:
+        await worker
+    except asyncio.CancelledError:
+        pass
+
+    from local_agent.api.websocket import stop_broadcaster
+
+    await stop_broadcaster()
     await browser_manager.stop()
+    await browser_pool.shutdown()
     logger.info("App shutdown complete")
 
 
@@ -57,12 +81,18 @@ def create_app() -> FastAPI:
     if FRONTEND_DIR.is_dir():
         app.mount("/assets", StaticFiles(directory=FRONTEND_DIR / "assets"), name="assets")
 
+        # Known build files, collected once so requests don't stat the disk
+        frontend_files = frozenset(
+            p.relative_to(FRONTEND_DIR).as_posix()
+            for p in FRONTEND_DIR.rglob("*")
+            if p.is_file()
+        )
+
         @app.get("/{full_path:path}")
         async def spa_fallback(full_path: str):
             """Serve index.html for all non-API routes (SPA routing)."""
-            file_path = FRONTEND_DIR / full_path
-            if file_path.is_file():
-                return FileResponse(file_path)
+            if full_path in frontend_files:
+                return FileResponse(FRONTEND_DIR / full_path)
             return FileResponse(FRONTEND_DIR / "index.html")
 
     return app
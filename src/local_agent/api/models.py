@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Literal, TypedDict
 
 from pydantic import BaseModel, Field
 
@@ -11,6 +12,10 @@ class TaskStatus(str, Enum):
     cancelled = "cancelled"
 
 
+# Response-side status type: plain strings validate faster than Enum members
+TaskStatusLiteral = Literal["pending", "running", "completed", "failed", "cancelled"]
+
+
 class TaskRequest(BaseModel):
     instruction: str = Field(..., description="What the agent should do", min_length=1)
     url: str | None = Field(None, description="Optional URL to navigate to first")
@@ -19,13 +24,13 @@ class TaskRequest(BaseModel):
 
 class TaskResponse(BaseModel):
     task_id: str
-    status: TaskStatus
+    status: TaskStatusLiteral
     instruction: str
 
 
 class TaskStatusResponse(BaseModel):
     task_id: str
-    status: TaskStatus
+    status: TaskStatusLiteral
     instruction: str
     steps_completed: int = 0
     current_action: str | None = None
@@ -67,20 +72,24 @@ class RecordingStopRequest(BaseModel):
     description: str = Field("", description="Optional description")
 
 
-class WorkflowStepResponse(BaseModel):
+# Leaf response shapes are plain TypedDicts: routes build them as dicts, which
+# avoids instantiating a model per step/row on list and status endpoints.
+
+
+class WorkflowStepResponse(TypedDict):
     action: str
-    description: str = ""
-    coordinates: list[int] | None = None
-    text: str = ""
-    key: str = ""
-    url: str = ""
-    element: dict = {}
+    description: str
+    coordinates: list[int] | None
+    text: str
+    key: str
+    url: str
+    element: dict
 
 
-class WorkflowParameterResponse(BaseModel):
+class WorkflowParameterResponse(TypedDict):
     name: str
-    label: str = ""
-    default: str = ""
+    label: str
+    default: str
 
 
 class WorkflowResponse(BaseModel):
@@ -107,14 +116,15 @@ class WorkflowRunRequest(BaseModel):
 class BatchRunRequest(BaseModel):
     mode: str = Field("direct", description="Replay mode: 'direct' or 'ai'")
     rows: list[dict[str, str]] = Field(..., description="List of parameter sets, one per row", min_length=1)
+    concurrency: int = Field(1, ge=1, le=8, description="Rows to run in parallel (direct mode only)")
 
 
-class BatchRowResponse(BaseModel):
+class BatchRowResponse(TypedDict):
     index: int
     parameters: dict[str, str]
     status: str
-    task_id: str = ""
-    error: str = ""
+    task_id: str
+    error: str
 
 
 class BatchResponse(BaseModel):
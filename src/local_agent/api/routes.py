@@ -1,6 +1,9 @@
 import asyncio
-import uuid
+import hashlib
+import os
+import time
 
+import orjson
 from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
 from fastapi.responses import Response
 
@@ -10,7 +13,6 @@ from local_agent.agent.replay import run_workflow_direct
 from local_agent.agent.workflow import Workflow, process_raw_events
 from local_agent.api.models import (
     BatchResponse,
-    BatchRowResponse,
     BatchRunRequest,
     ConfigResponse,
     ConfigUpdateRequest,
@@ -19,22 +21,32 @@ from local_agent.api.models import (
     RecordingStopRequest,
     TaskRequest,
     TaskResponse,
-    TaskStatus,
     TaskStatusResponse,
     WorkflowListResponse,
-    WorkflowParameterResponse,
     WorkflowResponse,
     WorkflowRunRequest,
-    WorkflowStepResponse,
 )
 from local_agent.browser.manager import BrowserManager
 from local_agent.browser.recorder import BrowserRecorder
 from local_agent.browser.screenshot import ScreenshotCapture
 from local_agent.browser.session import save_session
 from local_agent.config import settings
+from local_agent.utils.ids import new_id
+from local_agent.utils.logging import logger
 
 router = APIRouter()
 
+# Polls of /screenshot within this many seconds reuse the last capture
+SCREENSHOT_TTL = 0.1
+
+# Read-mostly workflow responses, keyed on file modification times and
+# dropped explicitly when a workflow is saved or deleted through the API
+_workflow_cache: dict[str, tuple[int, WorkflowResponse]] = {}  # name -> (mtime_ns, response)
+_workflow_list_cache: tuple[tuple, bytes] | None = None  # (snapshot, JSON body)
+
+# Last GET /config response; rebuilt whenever a route changes settings
+_config_cache: ConfigResponse | None = None
+
 
 def _browser(request: Request) -> BrowserManager:
     return request.app.state.browser
@@ -54,13 +66,27 @@ def _batches(request: Request) -> dict[str, BatchState]:
 
 def _is_busy(request: Request) -> bool:
     """Check if any task or batch is currently running."""
-    tasks = _tasks(request)
-    if any(t.status == TaskStatus.running for t in tasks.values()):
-        return True
-    batches = _batches(request)
-    if any(b.status == "running" for b in batches.values()):
-        return True
-    return False
+    state = request.app.state
+    return state.running_tasks > 0 or state.running_batches > 0
+
+
+def _spawn(request: Request, counter: str, coro) -> None:
+    """Queue a background job, counted in app.state.<counter> until it ends."""
+    state = request.app.state
+    setattr(state, counter, getattr(state, counter) + 1)
+    state.job_queue.put_nowait((counter, coro))
+
+
+async def job_worker(state) -> None:
+    """Run queued jobs one at a time (started in the app lifespan)."""
+    while True:
+        counter, coro = await state.job_queue.get()
+        try:
+            await coro
+        except Exception:
+            logger.exception("Background job failed")
+        finally:
+            setattr(state, counter, getattr(state, counter) - 1)
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -71,10 +97,19 @@ async def health(request: Request) -> HealthResponse:
 
 @router.get("/screenshot")
 async def screenshot(request: Request) -> Response:
-    bm = _browser(request)
-    sc = _screenshot(request)
-    png_bytes = await sc.capture_bytes(bm.page)
-    return Response(content=png_bytes, media_type="image/png")
+    state = request.app.state
+    if time.monotonic() - state.last_png_ts >= SCREENSHOT_TTL:
+        bm = _browser(request)
+        sc = _screenshot(request)
+        png_bytes = await sc.capture_bytes(bm.page)
+        state.last_png = png_bytes
+        state.last_png_etag = f'"{hashlib.blake2b(png_bytes, digest_size=8).hexdigest()}"'
+        state.last_png_ts = time.monotonic()
+
+    headers = {"ETag": state.last_png_etag, "Cache-Control": "max-age=0, must-revalidate"}
+    if request.headers.get("if-none-match") == state.last_png_etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=state.last_png, media_type="image/png", headers=headers)
 
 
 @router.post("/navigate")
@@ -93,32 +128,29 @@ async def session_save(request: Request) -> dict:
 
 @router.post("/task", response_model=TaskResponse)
 async def create_task(request: Request, body: TaskRequest) -> TaskResponse:
-    if _is_busy(request):
-        raise HTTPException(status_code=409, detail="A task or batch is already running")
+    # Hold the admit lock from the busy check until the job is queued
+    async with request.app.state.admit_lock:
+        if _is_busy(request):
+            raise HTTPException(status_code=409, detail="A task or batch is already running")
 
-    tasks = _tasks(request)
-    task_id = uuid.uuid4().hex[:12]
-    task = TaskState(task_id=task_id, instruction=body.instruction)
-    tasks[task_id] = task
+        tasks = _tasks(request)
+        task_id = new_id()
+        task = TaskState(task_id=task_id, instruction=body.instruction)
+        tasks[task_id] = task
 
-    bm = _browser(request)
-    sc = _screenshot(request)
+        bm = _browser(request)
+        sc = _screenshot(request)
 
-    # Navigate first if URL provided
-    if body.url:
-        await bm.page.goto(body.url, wait_until="domcontentloaded")
+        if body.max_steps:
+            settings.agent_max_steps = body.max_steps
+            _invalidate_config_cache()
 
-    if body.max_steps:
-        from local_agent.config import settings
-
-        settings.agent_max_steps = body.max_steps
-
-    # Run the agent loop in the background
-    asyncio.create_task(run_agent_loop(task, bm, sc))
+        # Run the agent loop in the background; it navigates to body.url first
+        _spawn(request, "running_tasks", run_agent_loop(task, bm, sc, url=body.url))
 
     return TaskResponse(
         task_id=task_id,
-        status=task.status,
+        status=task.status.value,
         instruction=body.instruction,
     )
 
@@ -131,7 +163,7 @@ async def get_task(request: Request, task_id: str) -> TaskStatusResponse:
         raise HTTPException(status_code=404, detail="Task not found")
     return TaskStatusResponse(
         task_id=task.task_id,
-        status=task.status,
+        status=task.status.value,
         instruction=task.instruction,
         steps_completed=task.steps_completed,
         current_action=task.current_action,
@@ -152,18 +184,15 @@ async def cancel_task(request: Request, task_id: str) -> dict:
 
 @router.get("/config", response_model=ConfigResponse)
 async def get_config() -> ConfigResponse:
-    return ConfigResponse(
-        llm_provider=settings.llm_provider,
-        llm_model=settings.llm_model,
-        ollama_model=settings.ollama_model,
-        ollama_base_url=settings.ollama_base_url,
-        agent_max_steps=settings.agent_max_steps,
-        agent_step_delay=settings.agent_step_delay,
-    )
+    global _config_cache
+    if _config_cache is None:
+        _config_cache = _build_config_response()
+    return _config_cache
 
 
 @router.post("/config", response_model=ConfigResponse)
 async def update_config(body: ConfigUpdateRequest) -> ConfigResponse:
+    global _config_cache
     if body.llm_provider is not None:
         settings.llm_provider = body.llm_provider
     if body.llm_model is not None:
@@ -174,6 +203,11 @@ async def update_config(body: ConfigUpdateRequest) -> ConfigResponse:
         settings.agent_max_steps = body.agent_max_steps
     if body.agent_step_delay is not None:
         settings.agent_step_delay = body.agent_step_delay
+    _config_cache = _build_config_response()
+    return _config_cache
+
+
+def _build_config_response() -> ConfigResponse:
     return ConfigResponse(
         llm_provider=settings.llm_provider,
         llm_model=settings.llm_model,
@@ -220,7 +254,9 @@ async def recording_stop(request: Request, body: RecordingStopRequest) -> Workfl
         start_url=start_url,
         steps=steps,
     )
-    workflow.save()
+    # Serialize and write off the event loop; long recordings take a while
+    await asyncio.to_thread(workflow.save)
+    _invalidate_workflow_cache(workflow.name)
 
     return _workflow_to_response(workflow)
 
@@ -229,24 +265,38 @@ async def recording_stop(request: Request, body: RecordingStopRequest) -> Workfl
 
 
 @router.get("/workflows", response_model=WorkflowListResponse)
-async def list_workflows() -> WorkflowListResponse:
-    workflows = Workflow.list_all()
-    return WorkflowListResponse(
-        workflows=[_workflow_to_response(w) for w in workflows]
-    )
+def list_workflows() -> Response:
+    # The body is encoded once per snapshot and returned as-is; the
+    # response_model only documents its shape.
+    global _workflow_list_cache
+    snapshot = _workflows_snapshot()
+    if _workflow_list_cache is None or _workflow_list_cache[0] != snapshot:
+        body = orjson.dumps({"workflows": [_workflow_to_dict(w) for w in Workflow.list_all()]})
+        _workflow_list_cache = (snapshot, body)
+    return Response(content=_workflow_list_cache[1], media_type="application/json")
 
 
 @router.get("/workflows/{name}", response_model=WorkflowResponse)
-async def get_workflow(name: str) -> WorkflowResponse:
+def get_workflow(name: str) -> WorkflowResponse:
+    try:
+        mtime = (settings.workflows_dir / f"{name}.yaml").stat().st_mtime_ns
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Workflow '{name}' not found")
+    cached = _workflow_cache.get(name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
     try:
         workflow = Workflow.load(name)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Workflow '{name}' not found")
-    return _workflow_to_response(workflow)
+    response = _workflow_to_response(workflow)
+    _workflow_cache[name] = (mtime, response)
+    return response
 
 
 @router.get("/workflows/{name}/preview")
-async def preview_workflow(name: str) -> dict:
+def preview_workflow(name: str) -> dict:
     """Preview the AI instruction that would be generated for a workflow."""
     try:
         workflow = Workflow.load(name)
@@ -290,40 +340,44 @@ async def run_workflow(request: Request, name: str, body: WorkflowRunRequest | N
         # All params have defaults — resolve with empty dict
         workflow = workflow.resolve({})
 
-    if _is_busy(request):
-        raise HTTPException(status_code=409, detail="A task or batch is already running")
-
-    tasks = _tasks(request)
-    mode = body.mode
-    instruction = workflow.to_instruction() if mode == "ai" else f"Replay workflow: {workflow.name}"
-    task_id = uuid.uuid4().hex[:12]
-    task = TaskState(task_id=task_id, instruction=instruction)
-    tasks[task_id] = task
-
-    bm = _browser(request)
-    sc = _screenshot(request)
-
-    # Navigate to start URL if present
-    if workflow.start_url:
-        await bm.page.goto(workflow.start_url, wait_until="domcontentloaded")
-
-    if mode == "ai":
-        # AI-based replay: uses LLM to interpret screenshots (costs API credits)
-        asyncio.create_task(run_agent_loop(task, bm, sc))
-    else:
-        # Direct replay: Playwright locators + coordinates (free, fast)
-        asyncio.create_task(run_workflow_direct(task, bm, sc, workflow))
+    # Hold the admit lock from the busy check until the job is queued
+    async with request.app.state.admit_lock:
+        if _is_busy(request):
+            raise HTTPException(status_code=409, detail="A task or batch is already running")
+
+        tasks = _tasks(request)
+        mode = body.mode
+        instruction = workflow.to_instruction() if mode == "ai" else f"Replay workflow: {workflow.name}"
+        task_id = new_id()
+        task = TaskState(task_id=task_id, instruction=instruction)
+        tasks[task_id] = task
+
+        bm = _browser(request)
+        sc = _screenshot(request)
+
+        # Both modes navigate to the start URL themselves, in the background
+        if mode == "ai":
+            # AI-based replay: uses LLM to interpret screenshots (costs API credits)
+            _spawn(request, "running_tasks", run_agent_loop(task, bm, sc, url=workflow.start_url))
+        else:
+            # Direct replay: Playwright locators + coordinates (free, fast)
+            _spawn(
+                request,
+                "running_tasks",
+                run_workflow_direct(task, bm, sc, workflow, url=workflow.start_url),
+            )
 
     return TaskResponse(
         task_id=task_id,
-        status=task.status,
+        status=task.status.value,
         instruction=instruction,
     )
 
 
 @router.delete("/workflows/{name}")
-async def delete_workflow(name: str) -> dict:
+def delete_workflow(name: str) -> dict:
     deleted = Workflow.delete(name)
+    _invalidate_workflow_cache(name)
     if not deleted:
         raise HTTPException(status_code=404, detail=f"Workflow '{name}' not found")
     return {"status": "ok", "name": name}
@@ -340,40 +394,45 @@ async def start_batch(request: Request, name: str, body: BatchRunRequest) -> Bat
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Workflow '{name}' not found")
 
-    if _is_busy(request):
-        raise HTTPException(status_code=409, detail="A task or batch is already running")
-
-    # Validate that all rows have the required parameters
-    param_names = {p.name for p in workflow.parameters}
-    required = {p.name for p in workflow.parameters if not p.default}
-    for i, row in enumerate(body.rows):
-        missing = required - set(row.keys())
-        if missing:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Row {i + 1} missing required parameters: {', '.join(missing)}",
-            )
-
-    batch_id = uuid.uuid4().hex[:12]
-    batch = BatchState(
-        batch_id=batch_id,
-        workflow_name=name,
-        mode=body.mode,
-        rows=body.rows,
-        results=[
-            BatchRowResult(index=i, parameters=row)
-            for i, row in enumerate(body.rows)
-        ],
-    )
-
-    batches = _batches(request)
-    batches[batch_id] = batch
+    # Hold the admit lock from the busy check until the job is queued
+    async with request.app.state.admit_lock:
+        if _is_busy(request):
+            raise HTTPException(status_code=409, detail="A task or batch is already running")
 
-    bm = _browser(request)
-    sc = _screenshot(request)
-    tasks = _tasks(request)
-
-    asyncio.create_task(run_batch(batch, workflow, bm, sc, tasks))
+        # Validate that all rows have the required parameters
+        param_names = {p.name for p in workflow.parameters}
+        required = tuple(p.name for p in workflow.parameters if not p.default)
+        if required:
+            for i, row in enumerate(body.rows):
+                for req in required:
+                    if req not in row:
+                        missing = [r for r in required if r not in row]
+                        raise HTTPException(
+                            status_code=422,
+                            detail=f"Row {i + 1} missing required parameters: {', '.join(missing)}",
+                        )
+
+        batch_id = new_id()
+        batch = BatchState(
+            batch_id=batch_id,
+            workflow_name=name,
+            mode=body.mode,
+            rows=body.rows,
+            concurrency=body.concurrency,
+            results=[
+                BatchRowResult(index=i, parameters=row)
+                for i, row in enumerate(body.rows)
+            ],
+        )
+
+        batches = _batches(request)
+        batches[batch_id] = batch
+
+        bm = _browser(request)
+        sc = _screenshot(request)
+        tasks = _tasks(request)
+
+        _spawn(request, "running_batches", run_batch(batch, workflow, bm, sc, tasks))
 
     return _batch_to_response(batch)
 
@@ -394,19 +453,46 @@ async def cancel_batch(request: Request, batch_id: str) -> dict:
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     batch.cancel()
-    # Also cancel the currently running task if any
-    if batch.results and 0 <= batch.current_index < len(batch.results):
-        current = batch.results[batch.current_index]
-        if current.task_id:
-            tasks = _tasks(request)
-            task = tasks.get(current.task_id)
+    # Also cancel the tasks of rows that are currently running
+    tasks = _tasks(request)
+    for r in batch.results:
+        if r.status == "running" and r.task_id:
+            task = tasks.get(r.task_id)
             if task:
                 task.cancel()
     return {"status": "ok", "batch_id": batch_id}
 
 
+def _invalidate_config_cache() -> None:
+    global _config_cache
+    _config_cache = None
+
+
+def _workflows_snapshot() -> tuple:
+    """(file name, mtime) of every workflow file — the list cache key."""
+    d = settings.workflows_dir
+    if not d.exists():
+        return ()
+    with os.scandir(d) as it:
+        return tuple(sorted(
+            (e.name, e.stat().st_mtime_ns)
+            for e in it
+            if e.name.endswith(".yaml") and e.is_file()
+        ))
+
+
+def _invalidate_workflow_cache(name: str) -> None:
+    global _workflow_list_cache
+    _workflow_cache.pop(name, None)
+    _workflow_list_cache = None
+
+
+# Response builders use model_construct: every value comes from our own
+# state objects, so pydantic validation would only repeat work.
+
+
 def _batch_to_response(batch: BatchState) -> BatchResponse:
-    return BatchResponse(
+    return BatchResponse.model_construct(
         batch_id=batch.batch_id,
         workflow_name=batch.workflow_name,
         status=batch.status,
@@ -414,43 +500,34 @@ def _batch_to_response(batch: BatchState) -> BatchResponse:
         completed=batch.completed_count,
         failed=batch.failed_count,
         current_index=batch.current_index,
-        rows=[
-            BatchRowResponse(
-                index=r.index,
-                parameters=r.parameters,
-                status=r.status,
-                task_id=r.task_id,
-                error=r.error,
-            )
-            for r in batch.results
-        ],
+        rows=[r.to_dict() for r in batch.results],
     )
 
 
 def _workflow_to_response(workflow: Workflow) -> WorkflowResponse:
-    return WorkflowResponse(
-        name=workflow.name,
-        description=workflow.description,
-        start_url=workflow.start_url,
-        recorded_at=workflow.recorded_at,
-        parameters=[
-            WorkflowParameterResponse(
-                name=p.name,
-                label=p.label,
-                default=p.default,
-            )
+    return WorkflowResponse.model_construct(**_workflow_to_dict(workflow))
+
+
+def _workflow_to_dict(workflow: Workflow) -> dict:
+    return {
+        "name": workflow.name,
+        "description": workflow.description,
+        "start_url": workflow.start_url,
+        "recorded_at": workflow.recorded_at,
+        "parameters": [
+            {"name": p.name, "label": p.label, "default": p.default}
             for p in workflow.parameters
         ],
-        steps=[
-            WorkflowStepResponse(
-                action=s.action,
-                description=s.description,
-                coordinates=s.coordinates,
-                text=s.text,
-                key=s.key,
-                url=s.url,
-                element=s.element.to_dict(),
-            )
+        "steps": [
+            {
+                "action": s.action,
+                "description": s.describe(),
+                "coordinates": s.coordinates,
+                "text": s.text,
+                "key": s.key,
+                "url": s.url,
+                "element": s.element.to_dict(),
+            }
             for s in workflow.steps
         ],
-    )
+    }
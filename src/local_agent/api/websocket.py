@@ -1,34 +1,109 @@
 import asyncio
-import json
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.websockets import WebSocketState
 
 from local_agent.utils.logging import logger
 
 router = APIRouter()
 
-# Global set of connected WebSocket clients
-_clients: set[WebSocket] = set()
+# Connected WebSocket clients. Published as an immutable tuple: writers
+# rebind it, so a broadcast can keep using the snapshot it read.
+_clients: tuple[WebSocket, ...] = ()
+
+# Outgoing events, drained by a background task so callers never wait on
+# slow clients. When full, the oldest event is dropped.
+_queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=64)
+_drain_task: asyncio.Task | None = None
+
+# Seconds a single client may take to accept a frame before it is dropped
+SEND_TIMEOUT = 1.0
+
+# Strong references to scheduled closes of dropped clients
+_pending_closes: set[asyncio.Task] = set()
 
 
 async def broadcast(event: dict) -> None:
-    """Send an event to all connected WebSocket clients."""
+    """Queue an event for all connected WebSocket clients. Never blocks."""
     if not _clients:
         return
-    message = json.dumps(event)
-    disconnected = set()
-    for ws in _clients:
+    global _drain_task
+    if _drain_task is None or _drain_task.done():
+        _drain_task = asyncio.create_task(_drain())
+    try:
+        _queue.put_nowait(event)
+    except asyncio.QueueFull:
+        _queue.get_nowait()
+        _queue.put_nowait(event)
+
+
+async def stop_broadcaster() -> None:
+    """Cancel the drain task (called on app shutdown)."""
+    global _drain_task
+    if _drain_task is not None:
+        _drain_task.cancel()
         try:
-            await ws.send_text(message)
-        except Exception:
-            disconnected.add(ws)
-    _clients.difference_update(disconnected)
+            await _drain_task
+        except asyncio.CancelledError:
+            pass
+        _drain_task = None
+
+
+async def _drain() -> None:
+    while True:
+        event = await _queue.get()
+        await _send_all(_encode(event))
+
+
+def _encode(event: dict) -> str:
+    """Serialize an event once. Frames stay text: the UI and CLI parse them
+    as JSON strings, and ASGI text frames must be str, not bytes."""
+    return orjson.dumps(event).decode()
+
+
+async def _send_all(message: str) -> None:
+    """Send to all clients concurrently; drop clients that fail or stall."""
+    global _clients
+    clients = _clients
+    results = await asyncio.gather(*(_safe_send(ws, message) for ws in clients))
+    dead = {ws for ws, ok in zip(clients, results) if not ok}
+    if dead:
+        _clients = tuple(ws for ws in _clients if ws not in dead)
+        # Close them too, so the client notices and reconnects or polls
+        # instead of waiting on a connection that gets no more events
+        for ws in dead:
+            task = asyncio.create_task(_close(ws))
+            _pending_closes.add(task)
+            task.add_done_callback(_pending_closes.discard)
+
+
+async def _safe_send(ws: WebSocket, message: str) -> bool:
+    if ws.client_state is not WebSocketState.CONNECTED:
+        return False
+    try:
+        await asyncio.wait_for(ws.send_text(message), timeout=SEND_TIMEOUT)
+        return True
+    except (RuntimeError, OSError, TimeoutError, WebSocketDisconnect):
+        # OSError covers the server's ClientDisconnected on a closed socket
+        return False
+
+
+async def _close(ws: WebSocket) -> None:
+    if ws.client_state is not WebSocketState.CONNECTED:
+        return
+    try:
+        # 1013 "try again later": the client fell behind
+        await asyncio.wait_for(ws.close(code=1013), timeout=SEND_TIMEOUT)
+    except (RuntimeError, OSError, TimeoutError, WebSocketDisconnect):
+        pass
 
 
 @router.websocket("/ws")  # mounted at /api/ws via prefix in app.py
 async def websocket_endpoint(websocket: WebSocket) -> None:
+    global _clients
     await websocket.accept()
-    _clients.add(websocket)
+    _clients = _clients + (websocket,)
     logger.info("WebSocket client connected (%d total)", len(_clients))
     try:
         while True:
@@ -37,5 +112,5 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
     except WebSocketDisconnect:
         pass
     finally:
-        _clients.discard(websocket)
+        _clients = tuple(ws for ws in _clients if ws is not websocket)
         logger.info("WebSocket client disconnected (%d total)", len(_clients))
@@ -1,18 +1,83 @@
+import asyncio
+import json
 from pathlib import Path
 
 from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
 
+from local_agent.browser.scripts import MUTATION_TRACKER_JS, RECORDER_JS
 from local_agent.config import settings
 from local_agent.utils.errors import BrowserError
 from local_agent.utils.logging import logger
 
+_LAUNCH_ARGS = [
+    "--no-sandbox",
+    "--disable-gpu",
+    "--start-maximized",
+    "--disable-blink-features=AutomationControlled",
+    # Keep timers and rendering at full rate when the window is unfocused or
+    # covered; the recorder's debounce and the pages the agent waits on rely on it
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-features=CalculateNativeWinOcclusion",
+]
 
-class BrowserManager:
-    """Manages the Playwright browser lifecycle."""
+
+class BrowserPool:
+    """Owns the single Playwright driver and Chromium process.
+
+    Every BrowserManager opens its own context on the shared browser;
+    contexts are isolated (cookies, storage) but far cheaper to create than
+    a new Chromium launch.
+    """
 
     def __init__(self) -> None:
         self._playwright: Playwright | None = None
         self._browser: Browser | None = None
+        self._lock = asyncio.Lock()
+
+    async def get_playwright(self) -> Playwright:
+        """Return the shared Playwright driver, starting it on first use."""
+        async with self._lock:
+            return await self._ensure_playwright()
+
+    async def get_browser(self) -> Browser:
+        """Return the shared browser, launching it on first use."""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                playwright = await self._ensure_playwright()
+                self._browser = await playwright.chromium.launch(
+                    headless=False,
+                    args=_LAUNCH_ARGS,
+                )
+                logger.info("Chromium launched")
+            return self._browser
+
+    async def _ensure_playwright(self) -> Playwright:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return self._playwright
+
+    async def shutdown(self) -> None:
+        """Close the shared browser and stop Playwright (app shutdown)."""
+        async with self._lock:
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+            self._browser = None
+            self._playwright = None
+            logger.info("Chromium stopped")
+
+
+browser_pool = BrowserPool()
+
+
+class BrowserManager:
+    """Manages one browser context and its page on the shared browser."""
+
+    def __init__(self, pool: BrowserPool = browser_pool) -> None:
+        self._pool = pool
         self._context: BrowserContext | None = None
         self._page: Page | None = None
 
@@ -29,46 +94,56 @@ class BrowserManager:
         return self._context
 
     async def start(self, storage_state_path: Path | None = None) -> Page:
-        """Launch Chromium on the Xvfb display and return the active page."""
-        logger.info("Starting browser...")
-
-        self._playwright = await async_playwright().start()
+        """Open a context and return the active page.
 
-        self._browser = await self._playwright.chromium.launch(
-            headless=False,
-            args=[
-                "--no-sandbox",
-                "--disable-gpu",
-                "--start-maximized",
-                "--disable-blink-features=AutomationControlled",
-            ],
-        )
+        With settings.browser_user_data_dir set, the context is a persistent
+        Chromium profile of its own, so cookies and the HTTP cache survive
+        restarts. Otherwise it is a fresh context on the shared browser.
+        """
+        logger.info("Starting browser...")
 
-        # Restore session if a storage_state file exists
         context_kwargs: dict = {
             "viewport": {"width": settings.browser_width, "height": settings.browser_height},
             "ignore_https_errors": True,
         }
-        if storage_state_path and storage_state_path.exists():
-            logger.info("Restoring session from %s", storage_state_path)
-            context_kwargs["storage_state"] = str(storage_state_path)
+        has_state = storage_state_path is not None and storage_state_path.exists()
+
+        user_data_dir = settings.browser_user_data_dir
+        if user_data_dir is not None:
+            first_run = not user_data_dir.exists()
+            playwright = await self._pool.get_playwright()
+            self._context = await playwright.chromium.launch_persistent_context(
+                str(user_data_dir),
+                headless=False,
+                args=_LAUNCH_ARGS,
+                **context_kwargs,
+            )
+            # Seed a new profile with the cookies of a saved session
+            if first_run and has_state:
+                logger.info("Importing session cookies from %s", storage_state_path)
+                state = json.loads(storage_state_path.read_text(encoding="utf-8"))
+                await self._context.add_cookies(state.get("cookies", []))
+        else:
+            # Restore session if a storage_state file exists
+            if has_state:
+                logger.info("Restoring session from %s", storage_state_path)
+                context_kwargs["storage_state"] = str(storage_state_path)
+            browser = await self._pool.get_browser()
+            self._context = await browser.new_context(**context_kwargs)
 
-        self._context = await self._browser.new_context(**context_kwargs)
-        self._page = await self._context.new_page()
+        await self._context.add_init_script(MUTATION_TRACKER_JS)
+        await self._context.add_init_script(RECORDER_JS)
+        # A persistent context opens with a blank page already
+        pages = self._context.pages
+        self._page = pages[0] if pages else await self._context.new_page()
 
         logger.info("Browser ready (%dx%d)", settings.browser_width, settings.browser_height)
         return self._page
 
     async def stop(self) -> None:
-        """Shut down browser and Playwright."""
+        """Close this manager's context; the shared browser keeps running."""
         if self._context:
             await self._context.close()
-        if self._browser:
-            await self._browser.close()
-        if self._playwright:
-            await self._playwright.stop()
         self._page = None
         self._context = None
-        self._browser = None
-        self._playwright = None
         logger.info("Browser stopped")
@@ -1,14 +1,29 @@
+import asyncio
 import base64
+import io
 import math
-from datetime import datetime, timezone
+import time
 from pathlib import Path
 
-from PIL import Image
-from playwright.async_api import Page
+from playwright.async_api import CDPSession, Page
 
 from local_agent.config import settings
 from local_agent.utils.logging import logger
 
+# Read per capture; neither can be changed at runtime (unlike the LLM settings
+# that POST /config edits), so they are bound once
+_JPEG_QUALITY = settings.screenshot_jpeg_quality
+_SCREENSHOTS_DIR = settings.screenshots_dir
+
+# Screenshot files being written in the background (see ScreenshotCapture.capture)
+_pending_writes: set[asyncio.Task] = set()
+
+# timeOrigin changes on every navigation, the counter on every mutation
+_PAGE_TOKEN_JS = (
+    "window.__mutationSeq === undefined ? null"
+    " : [performance.timeOrigin, window.__mutationSeq]"
+)
+
 
 def _scale_factor(width: int, height: int, max_dim: int = 1568) -> float:
     """Calculate scale factor to meet Anthropic's image constraints.
@@ -33,6 +48,15 @@ class ScreenshotCapture:
         self.scale: float = 1.0
         self.scaled_width: int = settings.browser_width
         self.scaled_height: int = settings.browser_height
+        self._last_image: bytes | None = None
+        self._last_page: Page | None = None
+        self._last_token: tuple | None = None
+        self._dirty: bool = True
+        self._cdp: CDPSession | None = None
+        self._cdp_page: Page | None = None
+        # Saved files are named <run id>_<counter>, unique even within a second
+        self._run_id = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+        self._saved = 0
         self._compute_scale()
 
     def _compute_scale(self) -> None:
@@ -56,38 +80,126 @@ class ScreenshotCapture:
         """Convert coordinates from scaled screenshot space to actual screen space."""
         return int(x / self.scale), int(y / self.scale)
 
-    async def capture(self, page: Page, *, save: bool = False) -> str:
-        """Take a screenshot, resize it, and return base64-encoded PNG."""
-        raw_bytes = await page.screenshot(type="png")
-
-        # Resize using Pillow
-        import io
+    def mark_dirty(self) -> None:
+        """Invalidate the cached capture (call after any input to the page)."""
+        self._dirty = True
+
+    async def capture_if_dirty(self, page: Page, *, save: bool = False) -> bytes:
+        """Return the last capture if the page is unchanged since, else capture.
+
+        The page counts as changed if input was sent to it (mark_dirty) or
+        if its navigation/mutation token moved on.
+        """
+        if not self._dirty and self._last_image is not None and page is self._last_page:
+            token = await _page_token(page)
+            if token is not None and token == self._last_token:
+                return self._last_image
+        return await self.capture(page, save=save)
+
+    async def capture(self, page: Page, *, save: bool = False) -> bytes:
+        """Take a screenshot, resize it, and return the JPEG bytes.
+
+        The bytes go into the conversation history as-is; providers
+        base64-encode them when building the request.
+        """
+        # Read the token first so a mutation during the screenshot forces a
+        # fresh capture next time
+        token = await _page_token(page)
+        image_bytes = await self._screenshot_jpeg(page, _JPEG_QUALITY)
 
-        img = Image.open(io.BytesIO(raw_bytes))
         if self.scale < 1.0:
-            img = img.resize((self.scaled_width, self.scaled_height), Image.LANCZOS)
-
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        png_bytes = buf.getvalue()
+            image_bytes = await asyncio.to_thread(
+                self._downscale, image_bytes, "JPEG", quality=_JPEG_QUALITY
+            )
 
         if save:
-            ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-            path = settings.screenshots_dir / f"screenshot_{ts}.png"
-            path.write_bytes(png_bytes)
-            logger.debug("Screenshot saved to %s", path)
-
-        return base64.b64encode(png_bytes).decode("utf-8")
+            # The disk write runs in a thread; the caller only needs the bytes
+            self._saved += 1
+            path = _SCREENSHOTS_DIR / f"screenshot_{self._run_id}_{self._saved:05d}.jpg"
+            write = asyncio.create_task(asyncio.to_thread(_save, path, image_bytes))
+            _pending_writes.add(write)
+            write.add_done_callback(_pending_writes.discard)
+
+        self._last_image = image_bytes
+        self._last_page = page
+        self._last_token = token
+        self._dirty = False
+        return image_bytes
+
+    async def _screenshot_jpeg(self, page: Page, quality: int) -> bytes:
+        """Capture the viewport as JPEG straight over CDP.
+
+        Page.captureScreenshot skips Playwright's screenshot preparation
+        (caret hiding, font and animation waits). If CDP is unavailable,
+        falls back to page.screenshot.
+        """
+        try:
+            if self._cdp is None or self._cdp_page is not page:
+                if self._cdp is not None:
+                    await _detach(self._cdp)
+                self._cdp = await page.context.new_cdp_session(page)
+                self._cdp_page = page
+            result = await self._cdp.send(
+                "Page.captureScreenshot",
+                {"format": "jpeg", "quality": quality, "captureBeyondViewport": False},
+            )
+            return base64.b64decode(result["data"])
+        except Exception as e:
+            logger.debug("CDP screenshot failed, using page.screenshot: %s", e)
+            self._cdp = None
+            self._cdp_page = None
+            return await page.screenshot(type="jpeg", quality=quality)
 
     async def capture_bytes(self, page: Page) -> bytes:
         """Take a screenshot and return raw PNG bytes (for API responses)."""
         raw_bytes = await page.screenshot(type="png")
-        import io
-
-        img = Image.open(io.BytesIO(raw_bytes))
-        if self.scale < 1.0:
-            img = img.resize((self.scaled_width, self.scaled_height), Image.LANCZOS)
-
+        if self.scale >= 1.0:
+            return raw_bytes
+        return await asyncio.to_thread(self._downscale, raw_bytes, "PNG")
+
+    def _downscale(self, data: bytes, fmt: str, **save_kwargs) -> bytes:
+        """Resize an encoded screenshot to the scaled size, keeping its format.
+
+        Only called when scale < 1.0; otherwise the browser's bytes are
+        returned untouched, without a Pillow decode/encode round-trip.
+        Runs in a worker thread, so it must not touch shared state.
+        """
+        # Pillow is only needed when downscaling, so it loads on first use
+        from PIL import Image
+
+        size = (self.scaled_width, self.scaled_height)
+        img = Image.open(io.BytesIO(data))
+        # For JPEG, libjpeg decodes at a reduced DCT scale where it can
+        img.draft("RGB", size)
+        # Pillow's resize filters all antialias when shrinking; bilinear is
+        # several times cheaper than Lanczos and the ~0.8x scale loses no detail
+        # the model (or the UI preview) can use
+        img = img.resize(size, Image.Resampling.BILINEAR)
         buf = io.BytesIO()
-        img.save(buf, format="PNG")
+        img.save(buf, format=fmt, **save_kwargs)
         return buf.getvalue()
+
+
+def _save(path: Path, data: bytes) -> None:
+    try:
+        path.write_bytes(data)
+        logger.debug("Screenshot saved to %s", path)
+    except OSError as e:
+        logger.warning("Failed to save screenshot %s: %s", path, e)
+
+
+async def _detach(session: CDPSession) -> None:
+    """Detach a CDP session that is being replaced."""
+    try:
+        await session.detach()
+    except Exception:
+        pass  # its page is already closed
+
+
+async def _page_token(page: Page) -> tuple | None:
+    """Return the page's change token, or None if it can't be read."""
+    try:
+        token = await page.evaluate(_PAGE_TOKEN_JS)
+    except Exception:
+        return None  # mid-navigation or closed — treat as changed
+    return tuple(token) if token is not None else None
@@ -0,0 +1,233 @@
+"""JavaScript installed into every page via BrowserContext.add_init_script."""
+
+# Injected into every document (see BrowserManager.start). Counts DOM
+# mutations, scrolls and resizes so the screenshot cache can tell whether
+# the page changed without taking a new screenshot.
+MUTATION_TRACKER_JS = """
+(() => {
+  if (window.__mutationSeq !== undefined) return;
+  window.__mutationSeq = 0;
+  const bump = () => { window.__mutationSeq++; };
+  new MutationObserver(bump).observe(document, {
+    subtree: true, childList: true, attributes: true, characterData: true,
+  });
+  addEventListener("scroll", bump, true);
+  addEventListener("resize", bump);
+})();
+"""
+
+# Injected into every document (see BrowserManager.start) to capture user
+# interactions. It stays idle until a BrowserRecorder starts on the page;
+# while recording, events are pushed to Python in batches through the
+# __recorder_push binding.
+RECORDER_JS = """
+(() => {
+    if (window.__recorder) return;
+
+    window.__recorder = { active: false, lastInputValues: {} };
+    const rec = window.__recorder;
+
+    // Events are sent to Python in batches: queued, then flushed when the
+    // page is idle (at most 200 ms later). Clicks and key presses flush at
+    // once, since they may navigate and must reach Python before the
+    // navigation event does.
+    let queue = [];
+    let flushScheduled = false;
+    const idle = window.requestIdleCallback || ((cb) => setTimeout(cb, 50));
+    const flush = () => {
+        flushScheduled = false;
+        if (!rec.active || !queue.length || !window.__recorder_push) return;
+        const batch = queue;
+        queue = [];
+        window.__recorder_push(batch);
+    };
+    const push = (evt) => {
+        queue.push(evt);
+        if (!flushScheduled) {
+            flushScheduled = true;
+            idle(flush, { timeout: 200 });
+        }
+    };
+    const pushNow = (evt) => {
+        queue.push(evt);
+        flush();
+    };
+    addEventListener('pagehide', flush);
+
+    // Turned on by BrowserRecorder.start; nothing from before is kept
+    rec.start = () => {
+        clearTimeout(inputTimer);
+        queue = [];
+        rec.lastInputValues = {};
+        rec.active = true;
+    };
+    // Turned off by BrowserRecorder.stop; hands back the events not yet
+    // pushed, including text input still waiting on the debounce timer
+    rec.stop = () => {
+        if (!rec.active) return [];
+        clearTimeout(inputTimer);
+        const events = queue.splice(0).concat(rec.takeInputs());
+        rec.active = false;
+        return events;
+    };
+    // A document loaded mid-recording asks Python whether to start. The
+    // check is deferred so the binding is in place by then.
+    setTimeout(() => {
+        if (!window.__recorder_active) return;
+        window.__recorder_active().then((on) => { if (on && !rec.active) rec.start(); });
+    }, 0);
+
+    // [DOM attribute, ElementInfo field]
+    const ATTRS = [
+        ['aria-label', 'aria_label'],
+        ['placeholder', 'placeholder'],
+        ['role', 'role'],
+        ['name', 'name'],
+        ['type', 'input_type'],
+        ['data-tooltip', 'tooltip'],
+        ['title', 'title'],
+    ];
+
+    function getOwnText(el) {
+        // Get only direct text of element, not children's text
+        let text = '';
+        for (const node of el.childNodes) {
+            if (node.nodeType === Node.TEXT_NODE) {
+                text += node.textContent.trim();
+            }
+        }
+        return text.substring(0, 60);
+    }
+
+    function getScreenRegion(x, y) {
+        const w = window.innerWidth;
+        const h = window.innerHeight;
+        const col = x < w * 0.25 ? 'left' : x > w * 0.75 ? 'right' : 'center';
+        const row = y < h * 0.3 ? 'top' : y > h * 0.7 ? 'bottom' : 'middle';
+        return row + '-' + col;
+    }
+
+    function elementInfo(el) {
+        if (!el || !el.tagName) return {};
+        const info = { tag: el.tagName.toLowerCase() };
+
+        // Get own text first (not children), fall back to textContent for small elements
+        const ownText = getOwnText(el);
+        const fullText = (el.textContent || '').trim();
+        if (ownText) {
+            info.text = ownText;
+        } else if (fullText.length <= 40) {
+            info.text = fullText;
+        }
+
+        // Standard attributes, each read once
+        for (const [attr, field] of ATTRS) {
+            const v = el.getAttribute(attr);
+            if (v) info[field] = v;
+        }
+
+        // Check if contenteditable (Gmail compose fields etc)
+        if (el.getAttribute('contenteditable') === 'true' || el.isContentEditable)
+            info.contenteditable = true;
+
+        // Parent context — helps identify where on the page
+        const parent = el.closest('[aria-label], [role="navigation"], [role="banner"], [role="main"], [role="complementary"], nav, header, aside, main');
+        if (parent && parent !== el) {
+            const parentLabel = parent.getAttribute('aria-label') || parent.getAttribute('role') || parent.tagName.toLowerCase();
+            if (parentLabel) info.parent_context = parentLabel.substring(0, 50);
+        }
+
+        // Nearby label — for input fields
+        if (el.id) {
+            const label = document.querySelector('label[for="' + el.id + '"]');
+            if (label) info.label = label.textContent.trim().substring(0, 40);
+        }
+
+        return info;
+    }
+
+    // Capture clicks (mousedown for accuracy)
+    document.addEventListener('mousedown', (e) => {
+        if (!rec.active) return;
+        pushNow({
+            type: 'click',
+            x: Math.round(e.clientX),
+            y: Math.round(e.clientY),
+            region: getScreenRegion(e.clientX, e.clientY),
+            timestamp: Date.now(),
+            element: elementInfo(e.target),
+            page_title: document.title
+        });
+    }, true);
+
+    // Capture text input — supports both <input> and contenteditable
+    document.addEventListener('change', (e) => {
+        if (!rec.active) return;
+        const el = e.target;
+        if (el.tagName && (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA' || el.tagName === 'SELECT')) {
+            push({
+                type: 'type',
+                text: el.value,
+                timestamp: Date.now(),
+                element: elementInfo(el)
+            });
+        }
+    }, true);
+
+    // Take the pending (debounced) input as one 'type' event per field
+    rec.takeInputs = () => {
+        const events = Object.values(rec.lastInputValues).map((v) => ({
+            type: 'type',
+            text: v.value,
+            timestamp: v.timestamp,
+            element: elementInfo(v.el)
+        }));
+        rec.lastInputValues = {};
+        return events;
+    };
+    const flushInputs = () => {
+        clearTimeout(inputTimer);
+        for (const evt of rec.takeInputs()) push(evt);
+    };
+
+    // Track typing in real-time (debounced) — also contenteditable.
+    // Only the latest value per field is kept until the flush.
+    let inputTimer = null;
+    document.addEventListener('input', (e) => {
+        if (!rec.active) return;
+        const el = e.target;
+        if (!el.tagName) return;
+        const tag = el.tagName;
+        const isEditable = el.isContentEditable;
+
+        if (tag !== 'INPUT' && tag !== 'TEXTAREA' && !isEditable) return;
+
+        const value = isEditable ? (el.innerText || '').trim() : el.value;
+        const key = el.getAttribute('aria-label') || el.getAttribute('name') || el.getAttribute('placeholder') || el.getAttribute('role') || 'unknown';
+
+        rec.lastInputValues[key] = { value, timestamp: Date.now(), el };
+
+        clearTimeout(inputTimer);
+        inputTimer = setTimeout(flushInputs, 400);
+    }, true);
+
+    // Leaving a field commits its text right away
+    document.addEventListener('focusout', () => {
+        if (rec.active && Object.keys(rec.lastInputValues).length) flushInputs();
+    }, true);
+
+    // Capture special key presses (Enter, Tab, Escape)
+    document.addEventListener('keydown', (e) => {
+        if (!rec.active) return;
+        const special = ['Enter', 'Tab', 'Escape', 'Backspace', 'Delete'];
+        if (special.includes(e.key)) {
+            pushNow({
+                type: 'key',
+                key: e.key,
+                timestamp: Date.now(),
+                element: elementInfo(e.target)
+            });
+        }
+    }, true);
+})();
+"""
@@ -17,11 +17,14 @@ class Settings(BaseSettings):
     # Browser
     browser_width: int = 1920
     browser_height: int = 1080
+    browser_user_data_dir: Path | None = None  # persistent Chromium profile (opt-in)
     screenshot_max_dimension: int = 1568
+    screenshot_jpeg_quality: int = 75  # agent screenshots (LLM input)
 
     # Agent
     agent_max_steps: int = 50
     agent_step_delay: float = 0.5
+    agent_image_window: int = 3  # screenshots kept as images in the LLM history
 
     # API
     api_host: str = "0.0.0.0"
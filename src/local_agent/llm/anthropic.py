@@ -1,7 +1,13 @@
 import anthropic
 
 from local_agent.config import settings
-from local_agent.llm.base import AgentAction, AgentResponse, LLMProvider
+from local_agent.llm.base import (
+    SCREENSHOT_MEDIA_TYPE,
+    AgentAction,
+    AgentResponse,
+    LLMProvider,
+    encode_images,
+)
 from local_agent.utils.errors import LLMError
 from local_agent.utils.logging import logger
 
@@ -18,28 +24,27 @@ class AnthropicProvider(LLMProvider):
         self._max_tokens = settings.llm_max_tokens
         self._scaled_width = scaled_width
         self._scaled_height = scaled_height
-
-    def _tool_definition(self) -> dict:
-        return {
+        # Identical for every request of this provider, so built once
+        self._tool_def = {
             "type": self.TOOL_TYPE,
             "name": "computer",
-            "display_width_px": self._scaled_width,
-            "display_height_px": self._scaled_height,
+            "display_width_px": scaled_width,
+            "display_height_px": scaled_height,
             "display_number": settings.display_num,
         }
+        self._base_kwargs = {
+            "model": self._model,
+            "max_tokens": self._max_tokens,
+            "tools": [self._tool_def],
+            "betas": [self.BETA_FLAG],
+        }
 
     async def send(
         self,
         messages: list[dict],
         system: str | None = None,
     ) -> AgentResponse:
-        kwargs: dict = {
-            "model": self._model,
-            "max_tokens": self._max_tokens,
-            "tools": [self._tool_definition()],
-            "messages": messages,
-            "betas": [self.BETA_FLAG],
-        }
+        kwargs: dict = {**self._base_kwargs, "messages": encode_images(messages)}
         if system:
             kwargs["system"] = system
 
@@ -50,6 +55,9 @@ class AnthropicProvider(LLMProvider):
 
         return self._parse_response(response)
 
+    async def aclose(self) -> None:
+        await self._client.close()
+
     def _parse_response(self, response) -> AgentResponse:
         actions: list[AgentAction] = []
         text_parts: list[str] = []
@@ -58,8 +66,7 @@ class AnthropicProvider(LLMProvider):
             if block.type == "text":
                 text_parts.append(block.text)
             elif block.type == "tool_use":
-                action = self._parse_tool_use(block)
-                actions.append(action)
+                actions.append(self._parse_tool_use(block))
 
         return AgentResponse(
             actions=actions,
@@ -70,23 +77,20 @@ class AnthropicProvider(LLMProvider):
 
     def _parse_tool_use(self, block) -> AgentAction:
         inp = block.input
-        action_type = inp.get("action", "unknown")
-
-        coordinate = None
-        if "coordinate" in inp:
-            coordinate = tuple(inp["coordinate"])
+        get = inp.get
+        c = get("coordinate")
 
         return AgentAction(
             tool_use_id=block.id,
-            action=action_type,
-            coordinate=coordinate,
-            text=inp.get("text"),
-            scroll_direction=inp.get("scroll_direction"),
-            scroll_amount=inp.get("scroll_amount"),
+            action=get("action", "unknown"),
+            coordinate=(c[0], c[1]) if c else None,
+            text=get("text"),
+            scroll_direction=get("scroll_direction"),
+            scroll_amount=get("scroll_amount"),
             raw=inp,
         )
 
-    def build_screenshot_result(self, tool_use_id: str, screenshot_b64: str) -> dict:
+    def build_screenshot_result(self, tool_use_id: str, screenshot: bytes) -> dict:
         return {
             "type": "tool_result",
             "tool_use_id": tool_use_id,
@@ -95,8 +99,8 @@ class AnthropicProvider(LLMProvider):
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/png",
-                        "data": screenshot_b64,
+                        "media_type": SCREENSHOT_MEDIA_TYPE,
+                        "data": screenshot,
                     },
                 }
             ],
@@ -1,7 +1,19 @@
+import base64
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any
 
+try:  # SIMD-accelerated base64, installed with the "fast" extra
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+# Screenshots sent to the LLM are JPEG (see ScreenshotCapture.capture):
+# Chromium encodes them in its own process, and they are several times
+# smaller than PNG
+SCREENSHOT_MEDIA_TYPE = "image/jpeg"
+
 
 @dataclass
 class AgentAction:
@@ -50,7 +62,7 @@ class LLMProvider(ABC):
     def build_screenshot_result(
         self,
         tool_use_id: str,
-        screenshot_b64: str,
+        screenshot: bytes,
     ) -> dict:
         """Build a tool_result message containing a screenshot image."""
         ...
@@ -63,3 +75,60 @@ class LLMProvider(ABC):
     ) -> dict:
         """Build a tool_result message with is_error: true."""
         ...
+
+    async def aclose(self) -> None:
+        """Release network resources (called when the agent run ends)."""
+
+
+# Recently encoded screenshots, keyed by the identity of their bytes object.
+# Every request re-sends the newest screenshots from the history, and an
+# unchanged page reuses the same capture, so most images hit this cache.
+# Entries hold a reference to the bytes, so an id can't be reused while cached.
+_ENCODED_MAX = 8
+_encoded: OrderedDict[int, tuple[bytes, str]] = OrderedDict()
+
+
+def encode_image(data: bytes) -> str:
+    """Base64-encode raw image bytes for an API payload."""
+    key = id(data)
+    hit = _encoded.get(key)
+    if hit is not None and hit[0] is data:
+        _encoded.move_to_end(key)
+        return hit[1]
+    if pybase64 is not None:
+        encoded = pybase64.b64encode_as_string(data)
+    else:
+        encoded = base64.b64encode(data).decode("ascii")
+    _encoded[key] = (data, encoded)
+    if len(_encoded) > _ENCODED_MAX:
+        _encoded.popitem(last=False)
+    return encoded
+
+
+def encode_images(messages: list[dict]) -> list[dict]:
+    """Return messages with raw screenshot bytes replaced by base64 strings.
+
+    The conversation history keeps screenshots as bytes; encoding happens
+    once per request at the wire boundary. Blocks without raw image data
+    are passed through unchanged.
+    """
+    return [
+        {**msg, "content": _encode_blocks(msg["content"])}
+        if isinstance(msg.get("content"), list)
+        else msg
+        for msg in messages
+    ]
+
+
+def _encode_blocks(blocks: list) -> list:
+    out = []
+    for block in blocks:
+        if isinstance(block, dict):
+            btype = block.get("type")
+            if btype == "image" and isinstance(block["source"].get("data"), bytes):
+                source = block["source"]
+                block = {**block, "source": {**source, "data": encode_image(source["data"])}}
+            elif btype == "tool_result" and isinstance(block.get("content"), list):
+                block = {**block, "content": _encode_blocks(block["content"])}
+        out.append(block)
+    return out
@@ -1,12 +1,20 @@
-import json
-import re
-import uuid
+import hashlib
+import logging
+from collections import deque
 
 import httpx
+import orjson
 
 from local_agent.config import settings
-from local_agent.llm.base import AgentAction, AgentResponse, LLMProvider
+from local_agent.llm.base import (
+    SCREENSHOT_MEDIA_TYPE,
+    AgentAction,
+    AgentResponse,
+    LLMProvider,
+    encode_image,
+)
 from local_agent.utils.errors import LLMError
+from local_agent.utils.ids import new_id
 from local_agent.utils.logging import logger
 
 OLLAMA_SYSTEM_PROMPT = """\
@@ -27,6 +35,12 @@ IMPORTANT: When the task appears to be complete (the expected page or result is
 Output ONLY the JSON. No other text.
 """
 
+# Shared by every request; never mutated
+_SYSTEM_MSG = {"role": "system", "content": OLLAMA_SYSTEM_PROMPT}
+
+# Follow-up sent once, on the same screenshot, when a reply held no action
+_JSON_ONLY_MSG = {"role": "user", "content": "Return ONLY the JSON object. No prose."}
+
 
 class OllamaProvider(LLMProvider):
     """Ollama vision model provider for browser automation.
@@ -42,9 +56,22 @@ class OllamaProvider(LLMProvider):
         self._model = settings.ollama_model
         self._scaled_width = scaled_width
         self._scaled_height = scaled_height
-        self._client = httpx.AsyncClient(timeout=180.0)
-        self._action_history: list[str] = []
+        # One client per provider (i.e. per agent run), closed by aclose().
+        # Connections are rarely reused: _stream_reply stops reading at the
+        # first complete object, which closes the connection so Ollama stops
+        # generating. That early stop is worth more than keep-alive here.
+        self._client = httpx.AsyncClient(
+            base_url=self._base_url,
+            timeout=httpx.Timeout(180.0, connect=10.0),
+        )
+        # Prompt lines for the last six actions, formatted once when recorded
+        self._history_lines: deque[str] = deque(maxlen=6)
+        self._action_count: int = 0
         self._empty_count: int = 0
+        # Digest of the screenshot the last recorded action was chosen on,
+        # and of the one sent this turn (recorded if it yields an action)
+        self._last_image_digest: bytes | None = None
+        self._turn_image_digest: bytes | None = None
 
     async def send(
         self,
@@ -52,82 +79,133 @@ class OllamaProvider(LLMProvider):
         system: str | None = None,
     ) -> AgentResponse:
         # Extract the task instruction and latest screenshot from messages
-        task_instruction = self._extract_task_instruction(messages)
-        latest_image = self._extract_latest_image(messages)
+        task_instruction, latest_image = self._extract_context(messages)
 
-        # Build a concise single-turn prompt
-        user_prompt = self._build_user_prompt(task_instruction)
+        # Flag a screenshot identical to the one the last action was chosen
+        # on, so the model knows that action had no visible effect
+        unchanged = False
+        self._turn_image_digest = None
+        if latest_image:
+            digest = hashlib.blake2b(latest_image.encode("ascii"), digest_size=16).digest()
+            unchanged = digest == self._last_image_digest and self._action_count > 0
+            self._turn_image_digest = digest
 
-        ollama_messages = [
-            {"role": "system", "content": OLLAMA_SYSTEM_PROMPT},
-        ]
+        # Build a concise single-turn prompt
+        user_prompt = self._build_user_prompt(task_instruction, unchanged)
 
         user_msg: dict = {"role": "user", "content": user_prompt}
         if latest_image:
             user_msg["images"] = [latest_image]
-        ollama_messages.append(user_msg)
-
-        logger.info("Sending to Ollama: task=%s, history=%d actions, has_image=%s",
-                     task_instruction[:60], len(self._action_history), bool(latest_image))
-
+        ollama_messages = [_SYSTEM_MSG, user_msg]
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Sending to Ollama: task=%s, history=%d actions, has_image=%s",
+                        task_instruction[:60], self._action_count, bool(latest_image))
+
+        payload = {
+            "model": self._model,
+            "messages": ollama_messages,
+            "stream": True,
+            # Constrain decoding to a JSON object; the stop cuts off
+            # the whitespace padding some models emit after it
+            "format": "json",
+            "options": {"temperature": 0.1, "num_predict": 80, "stop": ["\n\n\n"]},
+        }
         try:
-            resp = await self._client.post(
-                f"{self._base_url}/api/chat",
-                json={
-                    "model": self._model,
-                    "messages": ollama_messages,
-                    "stream": False,
-                    "options": {"temperature": 0.1, "num_predict": 100},
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            content = await self._stream_reply(payload)
+            action_data = self._extract_json(content)
+            if self._empty_count == 0 and (not action_data or "action" not in action_data):
+                # On the first miss, ask again right away: one short decode on
+                # the same image is cheaper than the screenshot round-trip
+                # _parse_response would otherwise return. Later misses in a
+                # streak go straight to that fallback.
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Ollama reply had no action, re-prompting: %s", content[:200])
+                payload["messages"] = [
+                    *ollama_messages,
+                    {"role": "assistant", "content": content},
+                    _JSON_ONLY_MSG,
+                ]
+                content = await self._stream_reply(payload)
+                action_data = self._extract_json(content)
         except httpx.HTTPError as exc:
             raise LLMError(f"Ollama error: {exc}") from exc
 
-        return self._parse_response(data)
-
-    def _extract_task_instruction(self, messages: list[dict]) -> str:
-        """Get the original task instruction from the first user message."""
+        return self._parse_response(content, action_data)
+
+    async def _stream_reply(self, payload: dict) -> str:
+        """Stream the reply and stop reading once it holds a complete object.
+
+        Leaving the stream early closes the connection, which makes Ollama
+        stop generating instead of decoding up to num_predict.
+        """
+        content = ""
+        # orjson encodes the body (mostly the base64 screenshot) in one pass
+        async with self._client.stream(
+            "POST",
+            "/api/chat",
+            content=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                if "error" in chunk:
+                    raise LLMError(f"Ollama error: {chunk['error']}")
+                content += chunk.get("message", {}).get("content", "")
+                if chunk.get("done"):
+                    break
+                start = content.find("{")
+                if start != -1 and _object_end(content, start) != -1:
+                    break
+        return content
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _extract_context(self, messages: list[dict]) -> tuple[str, str | None]:
+        """Get the task instruction and the latest screenshot.
+
+        The task is the first text of the first user message (found from the
+        front); the image is the most recent screenshot (base64), from a
+        message or tool_result (found from the back). Both scans stop at
+        their first hit, so older screenshots are never visited.
+        """
+        task = "Complete the task shown on screen."
         for msg in messages:
             if msg.get("role") != "user":
                 continue
             content = msg.get("content", "")
             if isinstance(content, str):
-                return content
+                task = content
+                break
             if isinstance(content, list):
-                for block in content:
-                    if isinstance(block, dict) and block.get("type") == "text":
-                        return block["text"]
-        return "Complete the task shown on screen."
-
-    def _extract_latest_image(self, messages: list[dict]) -> str | None:
-        """Get the most recent screenshot (base64) from messages."""
-        latest = None
-        for msg in messages:
-            content = msg.get("content", "")
-            if isinstance(content, list):
-                for block in content:
-                    if isinstance(block, dict):
-                        if block.get("type") == "image":
-                            latest = block["source"]["data"]
-                        elif block.get("type") == "tool_result":
-                            result_content = block.get("content", "")
-                            if isinstance(result_content, list):
-                                for item in result_content:
-                                    if isinstance(item, dict) and item.get("type") == "image":
-                                        latest = item["source"]["data"]
-        return latest
-
-    def _build_user_prompt(self, task: str) -> str:
+                text = next(
+                    (b["text"] for b in content if isinstance(b, dict) and b.get("type") == "text"),
+                    None,
+                )
+                if text is not None:
+                    task = text
+                    break
+
+        latest = _latest_image(messages)
+        if isinstance(latest, bytes):
+            latest = encode_image(latest)
+        return task, latest
+
+    def _build_user_prompt(self, task: str, unchanged: bool = False) -> str:
         """Build a single-turn prompt with task + history summary."""
         parts = [f"TASK: {task}"]
 
-        if self._action_history:
-            history = "\n".join(f"  {i+1}. {a}" for i, a in enumerate(self._action_history[-6:]))
+        if self._action_count:
+            history = "\n".join(self._history_lines)
             parts.append(f"\nActions already completed:\n{history}")
+            if unchanged:
+                parts.append("(Screenshot unchanged since last action.)")
 
-            if len(self._action_history) >= 4:
+            if self._action_count >= 4:
                 parts.append(
                     "\nLook at the screenshot. Has the task been completed? "
                     "If yes, respond with: {\"action\": \"done\", \"text\": \"description of result\"}\n"
@@ -141,11 +219,9 @@ class OllamaProvider(LLMProvider):
         parts.append("\nRespond with ONLY a JSON object.")
         return "\n".join(parts)
 
-    def _parse_response(self, data: dict) -> AgentResponse:
-        content = data.get("message", {}).get("content", "")
-        logger.info("Ollama response: %s", content[:500])
-
-        action_data = self._extract_json(content)
+    def _parse_response(self, content: str, action_data: dict | None) -> AgentResponse:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Ollama response: %s", content[:500])
 
         if not action_data or "action" not in action_data:
             self._empty_count += 1
@@ -163,7 +239,7 @@ class OllamaProvider(LLMProvider):
             # Retry with a screenshot
             return AgentResponse(
                 actions=[AgentAction(
-                    tool_use_id=f"ollama_{uuid.uuid4().hex[:8]}",
+                    tool_use_id=f"ollama_{new_id()}",
                     action="screenshot",
                     raw={"action": "screenshot"},
                 )],
@@ -173,40 +249,47 @@ class OllamaProvider(LLMProvider):
 
         # Valid action — reset empty counter
         self._empty_count = 0
-        action_type = action_data.get("action", "")
+        get = action_data.get
+        action_type = get("action", "")
+        text = get("text")
 
         if action_type == "done":
             return AgentResponse(
-                text=action_data.get("text", "Task completed"),
+                text=get("text", "Task completed"),
                 stop_reason="end_turn",
                 raw_content=[],
             )
 
         # Build an AgentAction
-        tool_use_id = f"ollama_{uuid.uuid4().hex[:8]}"
+        tool_use_id = f"ollama_{new_id()}"
         coordinate = None
-        if "coordinate" in action_data:
-            coord = action_data["coordinate"]
-            if isinstance(coord, list) and len(coord) == 2:
-                coordinate = tuple(coord)
+        coord = get("coordinate")
+        if (
+            isinstance(coord, list)
+            and len(coord) == 2
+            and all(isinstance(c, (int, float)) for c in coord)
+        ):
+            coordinate = (coord[0], coord[1])
 
         action = AgentAction(
             tool_use_id=tool_use_id,
             action=action_type,
             coordinate=coordinate,
-            text=action_data.get("text"),
-            scroll_direction=action_data.get("scroll_direction"),
-            scroll_amount=action_data.get("scroll_amount"),
+            text=text,
+            scroll_direction=get("scroll_direction"),
+            scroll_amount=get("scroll_amount"),
             raw=action_data,
         )
 
         # Record in history for context in next turn
-        history_entry = action_type
+        self._action_count += 1
+        self._last_image_digest = self._turn_image_digest
+        line = f"  {self._action_count}. {action_type}"
         if coordinate:
-            history_entry += f" at {list(coordinate)}"
-        if action_data.get("text"):
-            history_entry += f" '{action_data['text']}'"
-        self._action_history.append(history_entry)
+            line += f" at {list(coordinate)}"
+        if text:
+            line += f" '{text}'"
+        self._history_lines.append(line)
 
         return AgentResponse(
             actions=[action],
@@ -215,30 +298,40 @@ class OllamaProvider(LLMProvider):
         )
 
     def _extract_json(self, text: str) -> dict | None:
-        """Extract a JSON object from model output, handling markdown fences."""
+        """Extract a JSON object from model output, handling prose and markdown fences."""
         text = text.strip()
+        if "{" not in text:
+            return None
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
             pass
 
-        match = re.search(r"```(?:json)?\s*(\{.*?\})\s*```", text, re.DOTALL)
-        if match:
+        # A ```json fence: try its body as a whole first
+        if "```" in text:
+            _, _, rest = text.partition("```")
+            rest = rest.removeprefix("json")
+            end = rest.find("```")
+            if end != -1:
+                try:
+                    return orjson.loads(rest[:end].strip())
+                except orjson.JSONDecodeError:
+                    pass
+
+        # Otherwise take the first balanced {...} that parses
+        start = text.find("{")
+        while start != -1:
+            end = _object_end(text, start)
+            if end == -1:
+                break
             try:
-                return json.loads(match.group(1))
-            except json.JSONDecodeError:
-                pass
-
-        match = re.search(r"\{[^{}]*\}", text)
-        if match:
-            try:
-                return json.loads(match.group(0))
-            except json.JSONDecodeError:
-                pass
+                return orjson.loads(text[start:end])
+            except orjson.JSONDecodeError:
+                start = text.find("{", start + 1)
 
         return None
 
-    def build_screenshot_result(self, tool_use_id: str, screenshot_b64: str) -> dict:
+    def build_screenshot_result(self, tool_use_id: str, screenshot: bytes) -> dict:
         return {
             "type": "tool_result",
             "tool_use_id": tool_use_id,
@@ -247,8 +340,8 @@ class OllamaProvider(LLMProvider):
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/png",
-                        "data": screenshot_b64,
+                        "media_type": SCREENSHOT_MEDIA_TYPE,
+                        "data": screenshot,
                     },
                 }
             ],
@@ -261,3 +354,53 @@ class OllamaProvider(LLMProvider):
             "content": error,
             "is_error": True,
         }
+
+
+def _latest_image(messages: list[dict]):
+    """Raw data of the newest image block, searching from the end."""
+    for msg in reversed(messages):
+        content = msg.get("content", "")
+        if not isinstance(content, list):
+            continue
+        for block in reversed(content):
+            if not isinstance(block, dict):
+                continue
+            btype = block.get("type")
+            if btype == "image":
+                return block["source"]["data"]
+            if btype == "tool_result":
+                result_content = block.get("content", "")
+                if isinstance(result_content, list):
+                    for item in reversed(result_content):
+                        if isinstance(item, dict) and item.get("type") == "image":
+                            return item["source"]["data"]
+    return None
+
+
+def _object_end(text: str, start: int) -> int:
+    """Index just past the `}` closing the object that opens at `start`.
+
+    Tracks nesting and JSON string state (quotes, escapes) in one pass, so
+    braces inside strings don't count. Returns -1 if the object never closes.
+    """
+    depth = 0
+    in_str = False
+    esc = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif c == "\\":
+                esc = True
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
@@ -0,0 +1,12 @@
+import itertools
+import secrets
+
+# Random per-process prefix + counter: unique within and across runs without
+# hitting the OS random source on every id
+_PREFIX = secrets.token_hex(2)
+_counter = itertools.count()
+
+
+def new_id() -> str:
+    """Return a short unique id for tasks and batches (12 hex chars)."""
+    return f"{_PREFIX}{next(_counter):08x}"
@@ -1,19 +1,32 @@
 import logging
 import sys
+import time
+
+
+class _Formatter(logging.Formatter):
+    """Formatter whose HH:MM:SS timestamp is built once per second."""
+
+    _second: int = -1
+    _stamp: str = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        second = int(record.created)
+        if second != self._second:
+            t = time.localtime(second)
+            self._stamp = f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+            self._second = second
+        return self._stamp
 
 
 def setup_logging(level: str = "INFO") -> logging.Logger:
     logger = logging.getLogger("local_agent")
     logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+    # Our handler below is the only output; don't also pass records to root
+    logger.propagate = False
 
     if not logger.handlers:
         handler = logging.StreamHandler(sys.stdout)
-        handler.setFormatter(
-            logging.Formatter(
-                "%(asctime)s | %(name)s | %(levelname)s | %(message)s",
-                datefmt="%H:%M:%S",
-            )
-        )
+        handler.setFormatter(_Formatter("%(asctime)s | %(name)s | %(levelname)s | %(message)s"))
         logger.addHandler(handler)
 
     return logger